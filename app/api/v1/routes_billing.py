@@ -2,8 +2,9 @@
 """
 计费和套餐管理 API 路由
 """
+import time
 from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 from app.schemas.billing import (
     UserBillingInfo,
@@ -15,6 +16,36 @@ from app.services.auth.auth_service import get_current_user_id
 
 router = APIRouter()
 
+# /billing/me 响应缓存时间（秒）：客户端轮询时避免每次都读 Redis。
+# 只用于展示，扣费前的余额检查直接读 Redis，不经过这里
+BILLING_INFO_CACHE_TTL = 5
+# 缓存条目上限，超过时清理过期条目
+BILLING_INFO_CACHE_MAX_SIZE = 10000
+
+# user_id -> (缓存时间, 计费信息)
+_billing_info_cache: Dict[str, Tuple[float, UserBillingInfo]] = {}
+
+
+def _get_cached_billing_info(user_id: str) -> Optional[UserBillingInfo]:
+    """获取用户计费信息（BILLING_INFO_CACHE_TTL 秒内复用上次结果）"""
+    global _billing_info_cache
+    now = time.monotonic()
+    cached = _billing_info_cache.get(user_id)
+    if cached and now - cached[0] < BILLING_INFO_CACHE_TTL:
+        return cached[1]
+    
+    billing_info = billing_service.get_user_billing_info(user_id)
+    if billing_info is None:
+        return None
+    
+    if len(_billing_info_cache) >= BILLING_INFO_CACHE_MAX_SIZE:
+        _billing_info_cache = {
+            uid: entry for uid, entry in _billing_info_cache.items()
+            if now - entry[0] < BILLING_INFO_CACHE_TTL
+        }
+    _billing_info_cache[user_id] = (now, billing_info)
+    return billing_info
+
 
 @router.get("/billing/me", response_model=UserBillingInfo, summary="获取当前用户计费信息")
 async def get_my_billing_info(
@@ -36,7 +67,7 @@ async def get_my_billing_info(
     Authorization: Bearer <token>
     ```
     """
-    billing_info = billing_service.get_user_billing_info(current_user_id)
+    billing_info = _get_cached_billing_info(current_user_id)
     
     if not billing_info:
         raise HTTPException(
@@ -80,6 +111,8 @@ async def change_plan(
             new_plan_id=request.plan_id,
             reset_credits=True
         )
+        # 本进程内的变更立即反映到 /billing/me
+        _billing_info_cache.pop(current_user_id, None)
         return result
     
     except ValueError as e:
@@ -111,7 +144,9 @@ async def consume_credits(
     - success: 是否成功
     - remaining_credits: 剩余算力
     """
-    success = billing_service.consume_credits(current_user_id, amount)
+    success, remaining_credits = billing_service.consume_credits(current_user_id, amount)
+    # 本进程内的变更立即反映到 /billing/me
+    _billing_info_cache.pop(current_user_id, None)
     
     if not success:
         raise HTTPException(
@@ -119,12 +154,9 @@ async def consume_credits(
             detail="算力不足或用户不存在"
         )
     
-    # 获取更新后的信息
-    billing_info = billing_service.get_user_billing_info(current_user_id)
-    
     return {
         "success": True,
-        "remaining_credits": billing_info.current_credits if billing_info else 0
+        "remaining_credits": remaining_credits
     }
 
 
@@ -145,7 +177,9 @@ async def add_credits(
     - success: 是否成功
     - total_credits: 总算力
     """
-    success = billing_service.add_credits(current_user_id, amount)
+    success, total_credits = billing_service.add_credits(current_user_id, amount)
+    # 本进程内的变更立即反映到 /billing/me
+    _billing_info_cache.pop(current_user_id, None)
     
     if not success:
         raise HTTPException(
@@ -153,11 +187,8 @@ async def add_credits(
             detail="用户不存在"
         )
     
-    # 获取更新后的信息
-    billing_info = billing_service.get_user_billing_info(current_user_id)
-    
     return {
         "success": True,
-        "total_credits": billing_info.current_credits if billing_info else 0
+        "total_credits": total_credits
     }
 
@@ -2,17 +2,53 @@
 """
 套餐配置相关的 API 路由
 """
-from fastapi import APIRouter, HTTPException
-from typing import List
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request, Response
 
 from app.schemas.plan import Plan, PlanListResponse
-from app.config.plans import get_all_plans, get_plan_by_id, get_featured_plan
+from app.config.plans import get_all_plans_json, get_plan_json_by_id, get_featured_plan_json
 
 router = APIRouter()
 
+# 套餐为静态数据，JSON 在导入时已序列化；直接返回字节，
+# response_model 仅用于生成 OpenAPI 文档
+_JSON_MEDIA_TYPE = "application/json"
+# 套餐数据在进程生命周期内不变，允许客户端缓存一天
+_CACHE_CONTROL = "public, max-age=86400"
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """判断 If-None-Match 请求头是否命中当前 ETag（弱比较）"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _cached_json_response(request: Request, content: bytes, etag: str) -> Response:
+    """
+    返回预序列化的 JSON 响应，客户端已持有相同版本时返回 304
+    
+    Args:
+        request: 当前请求
+        content: JSON 字节
+        etag: 内容对应的 ETag
+        
+    Returns:
+        Response: 200（带内容）或 304（无内容）
+    """
+    headers = {"ETag": etag, "Cache-Control": _CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type=_JSON_MEDIA_TYPE, headers=headers)
+
 
 @router.get("/plans", response_model=PlanListResponse, summary="获取所有套餐")
-async def list_plans():
+async def list_plans(request: Request):
     """
     获取所有可用套餐配置
     
@@ -25,15 +61,12 @@ async def list_plans():
     GET /api/v1/plans
     ```
     """
-    plans = get_all_plans()
-    return PlanListResponse(
-        plans=plans,
-        total=len(plans)
-    )
+    content, etag = get_all_plans_json()
+    return _cached_json_response(request, content, etag)
 
 
 @router.get("/plans/{plan_id}", response_model=Plan, summary="获取单个套餐详情")
-async def get_plan(plan_id: str):
+async def get_plan(plan_id: str, request: Request):
     """
     根据 plan_id 获取单个套餐的详细信息
     
@@ -48,17 +81,18 @@ async def get_plan(plan_id: str):
     GET /api/v1/plans/pro
     ```
     """
-    plan = get_plan_by_id(plan_id)
-    if not plan:
+    payload = get_plan_json_by_id(plan_id)
+    if payload is None:
         raise HTTPException(
             status_code=404,
             detail=f"套餐 '{plan_id}' 不存在"
         )
-    return plan
+    content, etag = payload
+    return _cached_json_response(request, content, etag)
 
 
 @router.get("/plans/featured/current", response_model=Plan, summary="获取推荐套餐")
-async def get_featured():
+async def get_featured(request: Request):
     """
     获取当前推荐的套餐
     
@@ -70,11 +104,12 @@ async def get_featured():
     GET /api/v1/plans/featured/current
     ```
     """
-    plan = get_featured_plan()
-    if not plan:
+    payload = get_featured_plan_json()
+    if payload is None:
         raise HTTPException(
             status_code=404,
             detail="当前没有推荐套餐"
         )
-    return plan
+    content, etag = payload
+    return _cached_json_response(request, content, etag)
 
@@ -85,14 +85,14 @@ async def create_task(
             )
         
         # 3. 预扣除算力
-        consume_success = billing_service.consume_credits(current_user_id, required_credits)
+        consume_success, remaining_credits = billing_service.consume_credits(current_user_id, required_credits)
         if not consume_success:
             raise HTTPException(
                 status_code=500,
                 detail="算力扣除失败"
             )
         
-        print(f"✓ 算力扣除成功，剩余 {user_billing.current_credits - required_credits} 算力")
+        print(f"✓ 算力扣除成功，剩余 {remaining_credits} 算力")
         
         # 4. 创建任务
         task_service = get_task_service()
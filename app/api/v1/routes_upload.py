@@ -1,15 +1,22 @@
 """
 文件上传相关路由
 """
+import asyncio
+import logging
+import os
+import time
+
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Optional, Tuple
 
 from app.schemas.image import UploadImageResponse
-from app.services.storage import get_local_storage
+from app.services.storage import get_file_index, get_local_storage
 from app.utils.id_generator import generate_file_id
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 # 允许的文件类型
@@ -23,6 +30,56 @@ ALLOWED_TYPES = {
 # 最大文件大小（10MB）
 MAX_FILE_SIZE = 10 * 1024 * 1024
 
+# 上传请求体大小上限：文件上限再加上 multipart 边界和表单字段的余量
+MAX_UPLOAD_BODY_SIZE = MAX_FILE_SIZE + 64 * 1024
+
+# 有独立子目录的上传用途
+_ALLOWED_PURPOSES = frozenset({"source", "reference"})
+
+# 上一次生成的上传时间戳（秒, ISO 字符串）；同一秒内的上传复用同一个字符串
+_last_ts_cache: Tuple[int, str] = (0, "")
+
+
+def _uploaded_at() -> str:
+    """获取秒级精度的 UTC 上传时间（ISO 格式）"""
+    global _last_ts_cache
+    now_s = int(time.time())
+    cached_s, cached_iso = _last_ts_cache
+    if now_s == cached_s:
+        return cached_iso
+    iso = datetime.fromtimestamp(now_s, tz=timezone.utc).isoformat()
+    _last_ts_cache = (now_s, iso)
+    return iso
+
+
+def _sniff_image_type(header: bytes) -> Optional[str]:
+    """根据文件头魔数识别图片类型，无法识别时返回 None"""
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def _read_upload_header(file: UploadFile, length: int = 16) -> bytes:
+    """读取上传文件开头的若干字节（读取后复位）"""
+    file.file.seek(0)
+    header = file.file.read(length)
+    file.file.seek(0)
+    return header
+
+
+def _get_upload_size(file: UploadFile) -> int:
+    """获取上传文件大小（优先使用框架记录的 size）"""
+    if file.size is not None:
+        return file.size
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
+
 
 @router.post("/upload", response_model=UploadImageResponse)
 async def upload_image(
@@ -46,48 +103,61 @@ async def upload_image(
             detail=f"不支持的文件格式。支持的格式: JPG, PNG, WEBP"
         )
     
-    # 2. 读取文件数据
-    file_data = await file.read()
-    file_size = len(file_data)
+    # 2. 获取文件大小（上传内容已由框架缓存在临时文件中，无需再整体读入内存）
+    file_size = _get_upload_size(file)
     
-    # 3. 验证文件大小
+    # 3. 验证文件大小（带 Content-Length 的超限请求已在读取请求体之前由中间件拒绝，
+    #    这里兜底处理未声明长度的分块上传）
     if file_size > MAX_FILE_SIZE:
         raise HTTPException(
-            status_code=400,
+            status_code=413,
             detail=f"文件大小超过限制（最大 10MB）"
         )
     
-    # 4. 生成文件名
+    # 4. 根据文件头校验真实类型（不信任客户端声明的 Content-Type）
+    sniffed_type = _sniff_image_type(_read_upload_header(file))
+    if sniffed_type is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"文件内容不是有效的图片。支持的格式: JPG, PNG, WEBP"
+        )
+    
+    # 5. 生成文件名
     file_id = generate_file_id()
-    file_extension = ALLOWED_TYPES[file.content_type]
+    file_extension = ALLOWED_TYPES[sniffed_type]
     new_filename = f"{file_id}{file_extension}"
     
-    # 5. 根据用途确定子目录
-    subdirectory = purpose if purpose in ["source", "reference"] else "other"
+    # 6. 根据用途确定子目录
+    subdirectory = purpose if purpose in _ALLOWED_PURPOSES else "other"
     
-    # 6. 保存文件
+    # 7. 保存文件
     try:
         storage = get_local_storage()
-        relative_path = await storage.save_file(
-            file_data=file_data,
+        relative_path = await storage.save_fileobj(
+            file_obj=file.file,
             filename=new_filename,
             subdirectory=subdirectory
         )
         
-        # 7. 获取访问 URL
+        # 记录 file_id -> 路径索引，Worker 定位文件时无需遍历上传目录
+        await asyncio.to_thread(
+            get_file_index().record, file_id, relative_path
+        )
+        
+        # 8. 获取访问 URL
         file_url = storage.get_url(relative_path)
         
-        # 8. 返回响应
+        # 9. 返回响应
         return UploadImageResponse(
             file_id=file_id,
             filename=file.filename or new_filename,
             size=file_size,
             url=file_url,
-            uploaded_at=datetime.now().isoformat()
+            uploaded_at=_uploaded_at()
         )
         
     except Exception as e:
-        print(f"文件保存失败: {e}")
+        logger.exception("文件保存失败: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"文件保存失败: {str(e)}"
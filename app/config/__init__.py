@@ -2,12 +2,22 @@
 """
 配置模块
 """
-from .plans import get_all_plans, get_plan_by_id, get_featured_plan, OFFICIAL_PLANS
+from .plans import (
+    get_all_plans,
+    get_plan_by_id,
+    get_featured_plan,
+    get_all_plans_json,
+    get_plan_json_by_id,
+    get_featured_plan_json,
+    OFFICIAL_PLANS
+)
 
 __all__ = [
     "get_all_plans",
     "get_plan_by_id",
     "get_featured_plan",
+    "get_all_plans_json",
+    "get_plan_json_by_id",
+    "get_featured_plan_json",
     "OFFICIAL_PLANS"
 ]
-
@@ -3,8 +3,9 @@
 套餐配置数据
 官方套餐列表（硬编码）
 """
-from typing import List
-from app.schemas.plan import Plan
+import hashlib
+from typing import Dict, List, Optional, Tuple
+from app.schemas.plan import Plan, PlanListResponse
 
 
 # 官方套餐配置
@@ -85,14 +86,39 @@ OFFICIAL_PLANS: List[Plan] = [
 ]
 
 
-def get_all_plans() -> List[Plan]:
+# 套餐数据在运行期不变，导入时预先建立索引和排序视图
+_PLAN_BY_ID: Dict[str, Plan] = {p.plan_id: p for p in OFFICIAL_PLANS}
+_SORTED_PLANS: Tuple[Plan, ...] = tuple(sorted(OFFICIAL_PLANS, key=lambda p: p.sort_order))
+_FEATURED_PLAN: Optional[Plan] = next((p for p in OFFICIAL_PLANS if p.is_featured), None)
+
+
+# 序列化后的 JSON 字节及其 ETag，接口直接返回，避免每次请求重新校验和序列化
+def _json_payload(model) -> Tuple[bytes, str]:
+    """序列化模型并计算 ETag（带引号的强校验值）"""
+    content = model.model_dump_json().encode()
+    etag = '"' + hashlib.blake2b(content, digest_size=16).hexdigest() + '"'
+    return content, etag
+
+
+_PLANS_PAYLOAD: Tuple[bytes, str] = _json_payload(
+    PlanListResponse(plans=list(_SORTED_PLANS), total=len(_SORTED_PLANS))
+)
+_PAYLOAD_BY_ID: Dict[str, Tuple[bytes, str]] = {
+    p.plan_id: _json_payload(p) for p in OFFICIAL_PLANS
+}
+_FEATURED_PAYLOAD: Optional[Tuple[bytes, str]] = (
+    _PAYLOAD_BY_ID[_FEATURED_PLAN.plan_id] if _FEATURED_PLAN else None
+)
+
+
+def get_all_plans() -> Tuple[Plan, ...]:
     """
     获取所有套餐配置
     
     Returns:
         套餐列表（按 sort_order 排序）
     """
-    return sorted(OFFICIAL_PLANS, key=lambda p: p.sort_order)
+    return _SORTED_PLANS
 
 
 def get_plan_by_id(plan_id: str) -> Plan | None:
@@ -105,10 +131,7 @@ def get_plan_by_id(plan_id: str) -> Plan | None:
     Returns:
         套餐对象，如果不存在则返回 None
     """
-    for plan in OFFICIAL_PLANS:
-        if plan.plan_id == plan_id:
-            return plan
-    return None
+    return _PLAN_BY_ID.get(plan_id)
 
 
 def get_featured_plan() -> Plan | None:
@@ -118,8 +141,37 @@ def get_featured_plan() -> Plan | None:
     Returns:
         推荐的套餐，如果没有则返回 None
     """
-    for plan in OFFICIAL_PLANS:
-        if plan.is_featured:
-            return plan
-    return None
+    return _FEATURED_PLAN
+
+
+def get_all_plans_json() -> Tuple[bytes, str]:
+    """
+    获取套餐列表响应的 JSON 字节（PlanListResponse 格式）
+    
+    Returns:
+        (预先序列化的 JSON 字节, ETag)
+    """
+    return _PLANS_PAYLOAD
+
+
+def get_plan_json_by_id(plan_id: str) -> Optional[Tuple[bytes, str]]:
+    """
+    根据 plan_id 获取套餐的 JSON 字节
+    
+    Args:
+        plan_id: 套餐ID
+        
+    Returns:
+        (预先序列化的 JSON 字节, ETag)，如果不存在则返回 None
+    """
+    return _PAYLOAD_BY_ID.get(plan_id)
+
 
+def get_featured_plan_json() -> Optional[Tuple[bytes, str]]:
+    """
+    获取推荐套餐的 JSON 字节
+    
+    Returns:
+        (预先序列化的 JSON 字节, ETag)，如果没有推荐套餐则返回 None
+    """
+    return _FEATURED_PAYLOAD
@@ -8,9 +8,11 @@
     export REDIS_URL="redis://localhost:6379/0"
     export COMFYUI_BASE_URL="http://your-comfyui-server.com:7860"
 """
-from typing import Optional
+from functools import cached_property
+from typing import Optional, Tuple
 from pydantic_settings import BaseSettings
 import os
+import re
 
 
 class Settings(BaseSettings):
@@ -35,6 +37,7 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
     REDIS_PASSWORD: Optional[str] = None
+    REDIS_POOL_SIZE: int = 16  # 共享连接池上限（BLPOP 使用独立连接池，不占用这里的连接）
     
     @property
     def get_redis_url(self) -> str:
@@ -70,8 +73,17 @@ class Settings(BaseSettings):
     # 本地存储配置
     UPLOAD_DIR: str = "./uploads"
     RESULT_DIR: str = "./results"
+    # 上传文件索引（file_id -> 路径）数据库；不能放在 UPLOAD_DIR / RESULT_DIR 等对外提供静态访问的目录下。
+    # API 与 Worker 分开部署时应指向两者共享的同一路径，否则 Worker 回退为扫描上传目录
+    FILE_INDEX_PATH: str = "./data/file_index.sqlite"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_EXTENSIONS: set = {".jpg", ".jpeg", ".png", ".webp"}
+    STORAGE_IO_WORKERS: int = 8  # 文件写入线程池大小（并发上传共享）
+    PIL_FAST_DRAFT: bool = True  # 按目标尺寸加载 JPEG 时，让解码器直接缩小输出（draft 模式）
+    USE_OPENCV_RESIZE: bool = False  # 安装了 opencv-python 时用 cv2.resize（SIMD 加速）做 LANCZOS 缩放
+    # 进程内已解码源图缓存的内存上限（MB，0 表示关闭；按路径 + mtime 失效）。
+    # 每张图占用 宽 × 高 × 3 字节（1200 万像素约 36MB），每个 Worker 进程各自持有一份
+    DECODE_CACHE_MAX_MB: int = 80
     
     # 阿里云 OSS 配置（当 STORAGE_TYPE=oss 时使用）
     OSS_ENDPOINT: Optional[str] = None
@@ -84,6 +96,12 @@ class Settings(BaseSettings):
     TASK_RETENTION_DAYS: int = 7
     MAX_CONCURRENT_TASKS_PER_USER: int = 3
     TASK_QUEUE_NAME: str = "formy:tasks"
+    WORKER_PROCESSES: int = 1  # PipelineWorker 子进程数（>1 时以 spawn 方式启动多个独立 Worker 进程）
+    WORKER_PREFETCH_SIZE: int = 1  # PipelineWorker 本地预取队列容量（已从 Redis 取出、等待处理的任务数上限）
+    QUEUE_POP_TIMEOUT: int = 30  # Worker 阻塞等待新任务的时长（秒，BLPOP 超时，需 >= 1）
+    WORKER_CONCURRENCY: int = 1  # 每个 Worker 进程的并发消费线程数（不超过 REDIS_POOL_SIZE - 4）
+    PREWARM_MODES: str = ""  # Worker 启动时预先创建的 Pipeline（逗号分隔的编辑模式，如 "POSE_CHANGE"），其余首次使用时创建
+    PIPELINE_MOCK_DELAY: float = 0  # 骨架 Pipeline 每个步骤的模拟耗时（秒，仅用于本地演示，生产为 0）
     
     # ==================== JWT 认证配置 ====================
     # 支持 JWT_SECRET 和 SECRET_KEY（向后兼容）
@@ -98,38 +116,60 @@ class Settings(BaseSettings):
         return self.JWT_SECRET or self.SECRET_KEY
     
     # ==================== CORS 配置 ====================
-    # 允许的前端来源（逗号分隔），支持任何域名
-    # 示例: "http://localhost:3000,https://your-domain.com,https://app.example.com"
-    CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173,http://127.0.0.1:3000,http://127.0.0.1:5173"
+    # 额外允许的前端来源（逗号分隔，可含 * 通配符），默认为空、不额外放行任何来源；
+    # 这些来源同样允许携带凭证，仅在需要时通过环境变量显式开启
+    # 示例: "https://your-domain.com,https://*.example.com"
+    CORS_ORIGINS: str = ""
+    # 来源正则（默认允许所有 Vercel 域名和 localhost 开发端口）
+    CORS_ORIGIN_REGEX: Optional[str] = r"https://.*\.vercel\.app|http://localhost:\d+|https://formy-frontend\.vercel\.app"
     CORS_ALLOW_CREDENTIALS: bool = True
     CORS_ALLOW_METHODS: list = ["*"]
     CORS_ALLOW_HEADERS: list = ["*"]
     
-    @property
-    def get_cors_origins(self) -> list:
+    @cached_property
+    def get_cors_origins(self) -> Tuple[str, ...]:
         """
         解析 CORS 配置（支持逗号分隔的字符串）
         
         从环境变量 CORS_ORIGINS 读取允许的来源列表。
         支持任何域名，不限于特定云平台。
+        含通配符 * 的来源（如 https://*.vercel.app）不在此列表中，
+        由 get_cors_origin_regex 处理。结果只计算一次。
         
         示例环境变量：
             CORS_ORIGINS="https://formy-frontend.vercel.app,https://your-domain.com"
         
         Returns:
-            list: 允许的来源列表
+            tuple: 允许的来源列表（去重并保持顺序）
+        """
+        origins = (origin.strip() for origin in self.CORS_ORIGINS.split(","))
+        return tuple(dict.fromkeys(o for o in origins if o and "*" not in o))
+    
+    @cached_property
+    def get_cors_origin_regex(self) -> Optional[str]:
         """
-        if isinstance(self.CORS_ORIGINS, str):
-            origins = [origin.strip() for origin in self.CORS_ORIGINS.split(",") if origin.strip()]
-            # 去重并保持顺序
-            seen = set()
-            unique_origins = []
-            for origin in origins:
-                if origin not in seen:
-                    seen.add(origin)
-                    unique_origins.append(origin)
-            return unique_origins
-        return self.CORS_ORIGINS if isinstance(self.CORS_ORIGINS, list) else []
+        构建 CORS 来源正则（供 CORSMiddleware 的 allow_origin_regex 使用）
+        
+        合并 CORS_ORIGIN_REGEX 与 CORS_ORIGINS 中的通配符来源，
+        启动时编译校验一次，请求期间不再做 Python 层面的通配符匹配。
+        
+        Returns:
+            Optional[str]: 来源正则，没有任何规则时返回 None
+        """
+        patterns = []
+        if self.CORS_ORIGIN_REGEX:
+            patterns.append(self.CORS_ORIGIN_REGEX)
+        for origin in self.CORS_ORIGINS.split(","):
+            origin = origin.strip()
+            if "*" in origin:
+                patterns.append(re.escape(origin).replace(r"\*", r"[^/]*"))
+        
+        if not patterns:
+            return None
+        
+        pattern = "|".join(patterns)
+        re.compile(pattern)  # 配置错误时在启动阶段就暴露
+        return pattern
     
     # ==================== 邮件服务配置 ====================
     # 邮件提供商：resend / aliyun / smtp
@@ -7,150 +7,99 @@ from typing import Dict, Optional
 
 
 class TaskErrorCode(str, Enum):
-    """任务错误码枚举"""
+    """
+    任务错误码枚举
+    
+    每个成员的值仍是错误码字符串，同时携带用户友好的文案：
+    - message: 错误消息
+    - suggestion: 错误建议（可选）
+    """
+    
+    def __new__(cls, code: str, message: str, suggestion: Optional[str] = None):
+        obj = str.__new__(cls, code)
+        obj._value_ = code
+        obj.message = message
+        obj.suggestion = suggestion
+        return obj
     
     # ==================== 通用错误 (1xxx) ====================
-    UNKNOWN_ERROR = "UNKNOWN_ERROR"
-    INTERNAL_ERROR = "INTERNAL_ERROR"
-    INVALID_REQUEST = "INVALID_REQUEST"
+    UNKNOWN_ERROR = ("UNKNOWN_ERROR", "未知错误")
+    INTERNAL_ERROR = ("INTERNAL_ERROR", "系统内部错误")
+    INVALID_REQUEST = ("INVALID_REQUEST", "请求参数无效")
     
     # ==================== 任务数据错误 (2xxx) ====================
-    TASK_DATA_NOT_FOUND = "TASK_DATA_NOT_FOUND"
-    TASK_ALREADY_PROCESSING = "TASK_ALREADY_PROCESSING"
-    TASK_CANCELLED = "TASK_CANCELLED"
+    TASK_DATA_NOT_FOUND = ("TASK_DATA_NOT_FOUND", "任务数据不存在")
+    TASK_ALREADY_PROCESSING = ("TASK_ALREADY_PROCESSING", "任务正在处理中")
+    TASK_CANCELLED = ("TASK_CANCELLED", "任务已取消")
     
     # ==================== 参数验证错误 (3xxx) ====================
-    INVALID_MODE = "INVALID_MODE"
-    INVALID_SOURCE_IMAGE = "INVALID_SOURCE_IMAGE"
-    INVALID_REFERENCE_IMAGE = "INVALID_REFERENCE_IMAGE"
-    INVALID_CONFIG = "INVALID_CONFIG"
-    MISSING_REQUIRED_PARAM = "MISSING_REQUIRED_PARAM"
+    INVALID_MODE = ("INVALID_MODE", "编辑模式无效")
+    INVALID_SOURCE_IMAGE = ("INVALID_SOURCE_IMAGE", "原始图片无效")
+    INVALID_REFERENCE_IMAGE = ("INVALID_REFERENCE_IMAGE", "参考图片无效")
+    INVALID_CONFIG = ("INVALID_CONFIG", "配置参数无效")
+    MISSING_REQUIRED_PARAM = ("MISSING_REQUIRED_PARAM", "缺少必要参数")
     
     # ==================== 图片相关错误 (4xxx) ====================
-    IMAGE_NOT_FOUND = "IMAGE_NOT_FOUND"
-    IMAGE_FORMAT_INVALID = "IMAGE_FORMAT_INVALID"
-    IMAGE_SIZE_TOO_LARGE = "IMAGE_SIZE_TOO_LARGE"
-    IMAGE_SIZE_TOO_SMALL = "IMAGE_SIZE_TOO_SMALL"
-    IMAGE_LOAD_FAILED = "IMAGE_LOAD_FAILED"
-    IMAGE_DECODE_FAILED = "IMAGE_DECODE_FAILED"
+    IMAGE_NOT_FOUND = ("IMAGE_NOT_FOUND", "图片文件不存在")
+    IMAGE_FORMAT_INVALID = ("IMAGE_FORMAT_INVALID", "图片格式不支持", "请上传 JPG、PNG 或 WEBP 格式的图片")
+    IMAGE_SIZE_TOO_LARGE = ("IMAGE_SIZE_TOO_LARGE", "图片尺寸过大", "请上传小于 10MB 的图片")
+    IMAGE_SIZE_TOO_SMALL = ("IMAGE_SIZE_TOO_SMALL", "图片尺寸过小", "请上传分辨率至少为 512x512 的图片")
+    IMAGE_LOAD_FAILED = ("IMAGE_LOAD_FAILED", "图片加载失败")
+    IMAGE_DECODE_FAILED = ("IMAGE_DECODE_FAILED", "图片解码失败")
     
     # ==================== Pipeline 执行错误 (5xxx) ====================
-    PIPELINE_ERROR = "PIPELINE_ERROR"
-    PIPELINE_TIMEOUT = "PIPELINE_TIMEOUT"
-    PIPELINE_INIT_FAILED = "PIPELINE_INIT_FAILED"
-    PIPELINE_CONFIG_ERROR = "PIPELINE_CONFIG_ERROR"
+    PIPELINE_ERROR = ("PIPELINE_ERROR", "处理流程错误")
+    PIPELINE_TIMEOUT = ("PIPELINE_TIMEOUT", "处理超时")
+    PIPELINE_INIT_FAILED = ("PIPELINE_INIT_FAILED", "处理流程初始化失败")
+    PIPELINE_CONFIG_ERROR = ("PIPELINE_CONFIG_ERROR", "处理流程配置错误")
     
     # ==================== Engine 错误 (6xxx) ====================
-    ENGINE_NOT_AVAILABLE = "ENGINE_NOT_AVAILABLE"
-    ENGINE_CONNECTION_FAILED = "ENGINE_CONNECTION_FAILED"
-    ENGINE_TIMEOUT = "ENGINE_TIMEOUT"
-    ENGINE_RESPONSE_ERROR = "ENGINE_RESPONSE_ERROR"
-    ENGINE_AUTH_FAILED = "ENGINE_AUTH_FAILED"
+    ENGINE_NOT_AVAILABLE = ("ENGINE_NOT_AVAILABLE", "AI 引擎不可用")
+    ENGINE_CONNECTION_FAILED = ("ENGINE_CONNECTION_FAILED", "无法连接到 AI 引擎")
+    ENGINE_TIMEOUT = ("ENGINE_TIMEOUT", "AI 引擎响应超时")
+    ENGINE_RESPONSE_ERROR = ("ENGINE_RESPONSE_ERROR", "AI 引擎返回错误")
+    ENGINE_AUTH_FAILED = ("ENGINE_AUTH_FAILED", "AI 引擎认证失败")
     
     # ==================== ComfyUI 特定错误 (7xxx) ====================
-    COMFYUI_NOT_AVAILABLE = "COMFYUI_NOT_AVAILABLE"
-    COMFYUI_CONNECTION_TIMEOUT = "COMFYUI_CONNECTION_TIMEOUT"
-    COMFYUI_WORKFLOW_ERROR = "COMFYUI_WORKFLOW_ERROR"
-    COMFYUI_PROCESSING_FAILED = "COMFYUI_PROCESSING_FAILED"
-    COMFYUI_RESULT_NOT_FOUND = "COMFYUI_RESULT_NOT_FOUND"
+    COMFYUI_NOT_AVAILABLE = ("COMFYUI_NOT_AVAILABLE", "ComfyUI 服务不可用", "AI 服务暂时不可用，请稍后重试")
+    COMFYUI_CONNECTION_TIMEOUT = ("COMFYUI_CONNECTION_TIMEOUT", "连接 ComfyUI 超时", "网络连接超时，请检查网络或稍后重试")
+    COMFYUI_WORKFLOW_ERROR = ("COMFYUI_WORKFLOW_ERROR", "ComfyUI 工作流配置错误")
+    COMFYUI_PROCESSING_FAILED = ("COMFYUI_PROCESSING_FAILED", "ComfyUI 处理失败")
+    COMFYUI_RESULT_NOT_FOUND = ("COMFYUI_RESULT_NOT_FOUND", "无法获取 ComfyUI 处理结果")
     
     # ==================== 资源错误 (8xxx) ====================
-    INSUFFICIENT_CREDITS = "INSUFFICIENT_CREDITS"
-    RESOURCE_LIMIT_EXCEEDED = "RESOURCE_LIMIT_EXCEEDED"
-    STORAGE_FULL = "STORAGE_FULL"
+    INSUFFICIENT_CREDITS = ("INSUFFICIENT_CREDITS", "算力不足", "请充值算力或升级套餐")
+    RESOURCE_LIMIT_EXCEEDED = ("RESOURCE_LIMIT_EXCEEDED", "资源使用超限")
+    STORAGE_FULL = ("STORAGE_FULL", "存储空间已满")
     
     # ==================== 业务逻辑错误 (9xxx) ====================
-    PROCESSING_FAILED = "PROCESSING_FAILED"
-    RESULT_SAVE_FAILED = "RESULT_SAVE_FAILED"
-    NO_FACE_DETECTED = "NO_FACE_DETECTED"
-    MULTIPLE_FACES_DETECTED = "MULTIPLE_FACES_DETECTED"
-    POSE_EXTRACTION_FAILED = "POSE_EXTRACTION_FAILED"
+    PROCESSING_FAILED = ("PROCESSING_FAILED", "处理失败")
+    RESULT_SAVE_FAILED = ("RESULT_SAVE_FAILED", "结果保存失败")
+    NO_FACE_DETECTED = ("NO_FACE_DETECTED", "未检测到人脸", "请确保图片中包含清晰可见的人脸")
+    MULTIPLE_FACES_DETECTED = ("MULTIPLE_FACES_DETECTED", "检测到多张人脸", "请上传只包含单个人脸的图片")
+    POSE_EXTRACTION_FAILED = ("POSE_EXTRACTION_FAILED", "姿势提取失败")
 
 
 class ErrorMessage:
-    """错误消息定义 - 用户友好的文案"""
-    
-    # 错误码到消息的映射
-    MESSAGES: Dict[TaskErrorCode, str] = {
-        # 通用错误
-        TaskErrorCode.UNKNOWN_ERROR: "未知错误",
-        TaskErrorCode.INTERNAL_ERROR: "系统内部错误",
-        TaskErrorCode.INVALID_REQUEST: "请求参数无效",
-        
-        # 任务数据错误
-        TaskErrorCode.TASK_DATA_NOT_FOUND: "任务数据不存在",
-        TaskErrorCode.TASK_ALREADY_PROCESSING: "任务正在处理中",
-        TaskErrorCode.TASK_CANCELLED: "任务已取消",
-        
-        # 参数验证错误
-        TaskErrorCode.INVALID_MODE: "编辑模式无效",
-        TaskErrorCode.INVALID_SOURCE_IMAGE: "原始图片无效",
-        TaskErrorCode.INVALID_REFERENCE_IMAGE: "参考图片无效",
-        TaskErrorCode.INVALID_CONFIG: "配置参数无效",
-        TaskErrorCode.MISSING_REQUIRED_PARAM: "缺少必要参数",
-        
-        # 图片相关错误
-        TaskErrorCode.IMAGE_NOT_FOUND: "图片文件不存在",
-        TaskErrorCode.IMAGE_FORMAT_INVALID: "图片格式不支持",
-        TaskErrorCode.IMAGE_SIZE_TOO_LARGE: "图片尺寸过大",
-        TaskErrorCode.IMAGE_SIZE_TOO_SMALL: "图片尺寸过小",
-        TaskErrorCode.IMAGE_LOAD_FAILED: "图片加载失败",
-        TaskErrorCode.IMAGE_DECODE_FAILED: "图片解码失败",
-        
-        # Pipeline 执行错误
-        TaskErrorCode.PIPELINE_ERROR: "处理流程错误",
-        TaskErrorCode.PIPELINE_TIMEOUT: "处理超时",
-        TaskErrorCode.PIPELINE_INIT_FAILED: "处理流程初始化失败",
-        TaskErrorCode.PIPELINE_CONFIG_ERROR: "处理流程配置错误",
-        
-        # Engine 错误
-        TaskErrorCode.ENGINE_NOT_AVAILABLE: "AI 引擎不可用",
-        TaskErrorCode.ENGINE_CONNECTION_FAILED: "无法连接到 AI 引擎",
-        TaskErrorCode.ENGINE_TIMEOUT: "AI 引擎响应超时",
-        TaskErrorCode.ENGINE_RESPONSE_ERROR: "AI 引擎返回错误",
-        TaskErrorCode.ENGINE_AUTH_FAILED: "AI 引擎认证失败",
-        
-        # ComfyUI 特定错误
-        TaskErrorCode.COMFYUI_NOT_AVAILABLE: "ComfyUI 服务不可用",
-        TaskErrorCode.COMFYUI_CONNECTION_TIMEOUT: "连接 ComfyUI 超时",
-        TaskErrorCode.COMFYUI_WORKFLOW_ERROR: "ComfyUI 工作流配置错误",
-        TaskErrorCode.COMFYUI_PROCESSING_FAILED: "ComfyUI 处理失败",
-        TaskErrorCode.COMFYUI_RESULT_NOT_FOUND: "无法获取 ComfyUI 处理结果",
-        
-        # 资源错误
-        TaskErrorCode.INSUFFICIENT_CREDITS: "算力不足",
-        TaskErrorCode.RESOURCE_LIMIT_EXCEEDED: "资源使用超限",
-        TaskErrorCode.STORAGE_FULL: "存储空间已满",
-        
-        # 业务逻辑错误
-        TaskErrorCode.PROCESSING_FAILED: "处理失败",
-        TaskErrorCode.RESULT_SAVE_FAILED: "结果保存失败",
-        TaskErrorCode.NO_FACE_DETECTED: "未检测到人脸",
-        TaskErrorCode.MULTIPLE_FACES_DETECTED: "检测到多张人脸",
-        TaskErrorCode.POSE_EXTRACTION_FAILED: "姿势提取失败",
-    }
+    """错误消息定义 - 用户友好的文案（文案定义在 TaskErrorCode 成员上）"""
+    
+    # 错误码到消息的映射（兼容旧的字典访问方式）
+    MESSAGES: Dict[TaskErrorCode, str] = {code: code.message for code in TaskErrorCode}
     
     # 错误详情建议
     SUGGESTIONS: Dict[TaskErrorCode, str] = {
-        TaskErrorCode.IMAGE_FORMAT_INVALID: "请上传 JPG、PNG 或 WEBP 格式的图片",
-        TaskErrorCode.IMAGE_SIZE_TOO_LARGE: "请上传小于 10MB 的图片",
-        TaskErrorCode.IMAGE_SIZE_TOO_SMALL: "请上传分辨率至少为 512x512 的图片",
-        TaskErrorCode.COMFYUI_NOT_AVAILABLE: "AI 服务暂时不可用，请稍后重试",
-        TaskErrorCode.COMFYUI_CONNECTION_TIMEOUT: "网络连接超时，请检查网络或稍后重试",
-        TaskErrorCode.NO_FACE_DETECTED: "请确保图片中包含清晰可见的人脸",
-        TaskErrorCode.MULTIPLE_FACES_DETECTED: "请上传只包含单个人脸的图片",
-        TaskErrorCode.INSUFFICIENT_CREDITS: "请充值算力或升级套餐",
+        code: code.suggestion for code in TaskErrorCode if code.suggestion
     }
     
     @classmethod
     def get_message(cls, error_code: TaskErrorCode) -> str:
         """获取错误消息"""
-        return cls.MESSAGES.get(error_code, "处理失败")
+        return error_code.message
     
     @classmethod
     def get_suggestion(cls, error_code: TaskErrorCode) -> Optional[str]:
         """获取错误建议"""
-        return cls.SUGGESTIONS.get(error_code)
+        return error_code.suggestion
     
     @classmethod
     def format_error(
@@ -170,17 +119,16 @@ class ErrorMessage:
         Returns:
             dict: 格式化的错误字典
         """
-        message = custom_message or cls.get_message(error_code)
-        suggestion = cls.get_suggestion(error_code)
-        
-        # 构建详情
-        details_parts = []
-        if suggestion:
-            details_parts.append(suggestion)
-        if custom_details:
-            details_parts.append(custom_details)
+        message = custom_message or error_code.message
+        suggestion = error_code.suggestion
         
-        details = "\n".join(details_parts) if details_parts else None
+        # 构建详情（没有自定义详情时直接使用建议文案）
+        if not custom_details:
+            details = suggestion
+        elif suggestion:
+            details = f"{suggestion}\n{custom_details}"
+        else:
+            details = custom_details
         
         return {
             "code": error_code.value,
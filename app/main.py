@@ -1,8 +1,9 @@
 """
 FastAPI 应用入口
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
@@ -16,14 +17,33 @@ app = FastAPI(
     debug=settings.DEBUG
 )
 
+# 上传大小限制：按 Content-Length 在读取请求体之前拒绝超限上传，避免框架先把整个请求体缓存到临时文件
+# （注册在 CORS 之前，使 413 响应同样带上 CORS 头）
+UPLOAD_PATH = f"{settings.API_V1_PREFIX}/upload"
+
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """拒绝 Content-Length 超过上限的上传请求"""
+    if request.method == "POST" and request.url.path == UPLOAD_PATH:
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > routes_upload.MAX_UPLOAD_BODY_SIZE:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": "文件大小超过限制（最大 10MB）"}
+            )
+    return await call_next(request)
+
+
 # 配置 CORS
 # 支持 Vercel 预览域名（*.vercel.app）和生产域名
 from starlette.middleware.cors import CORSMiddleware as StarletteCORSMiddleware
 
 app.add_middleware(
     StarletteCORSMiddleware,
-    # 使用正则表达式匹配所有 Vercel 域名和本地开发域名
-    allow_origin_regex=r"https://.*\.vercel\.app|http://localhost:\d+|https://formy-frontend\.vercel\.app",
+    # 默认只按 CORS_ORIGIN_REGEX 匹配 Vercel/本地开发域名；CORS_ORIGINS 为可选的额外来源（默认为空）
+    allow_origins=list(settings.get_cors_origins),
+    allow_origin_regex=settings.get_cors_origin_regex,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
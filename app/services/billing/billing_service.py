@@ -6,7 +6,7 @@
 import redis
 import json
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from app.core.config import settings
 from app.models.user import User
@@ -15,12 +15,46 @@ from app.config.plans import get_plan_by_id
 from app.utils.redis_client import get_redis_client
 
 
+# 原子扣除算力：余额不足返回 -2，用户不存在返回 -1，否则返回扣除后的余额
+_CONSUME_CREDITS_LUA = """
+local raw = redis.call('GET', KEYS[1])
+if not raw then
+    return -1
+end
+local user = cjson.decode(raw)
+local amount = tonumber(ARGV[1])
+local credits = tonumber(user['current_credits']) or 0
+if credits < amount then
+    return -2
+end
+user['current_credits'] = credits - amount
+user['total_credits_used'] = (tonumber(user['total_credits_used']) or 0) + amount
+redis.call('SET', KEYS[1], cjson.encode(user))
+return user['current_credits']
+"""
+
+# 原子增加算力：用户不存在返回 -1，否则返回增加后的余额
+_ADD_CREDITS_LUA = """
+local raw = redis.call('GET', KEYS[1])
+if not raw then
+    return -1
+end
+local user = cjson.decode(raw)
+user['current_credits'] = (tonumber(user['current_credits']) or 0) + tonumber(ARGV[1])
+redis.call('SET', KEYS[1], cjson.encode(user))
+return user['current_credits']
+"""
+
+
 class BillingService:
     """计费服务"""
     
     def __init__(self):
         # 使用统一的 Redis 客户端（基于 REDIS_URL）
         self.redis_client = get_redis_client()
+        # 算力变更脚本（在 Redis 端原子执行，避免读-改-写竞争）
+        self._consume_credits_script = self.redis_client.register_script(_CONSUME_CREDITS_LUA)
+        self._add_credits_script = self.redis_client.register_script(_ADD_CREDITS_LUA)
     
     def _get_user_key(self, user_id: str) -> str:
         """获取用户在 Redis 中的键"""
@@ -169,34 +203,28 @@ class BillingService:
             plan_renew_at=user.plan_renew_at
         )
     
-    def consume_credits(self, user_id: str, amount: int) -> bool:
+    def consume_credits(self, user_id: str, amount: int) -> Tuple[bool, int]:
         """
         消耗用户算力
         
+        检查余额与扣除在 Redis 中一次原子完成，并直接返回扣除后的余额。
+        
         Args:
             user_id: 用户ID
             amount: 消耗的算力数量
             
         Returns:
-            是否成功
+            (是否成功, 剩余算力)；失败时剩余算力为 0
         """
-        user = self.get_user(user_id)
-        if not user:
-            return False
-        
-        # 检查算力是否足够
-        if user.current_credits < amount:
-            return False
-        
-        # 扣除算力
-        user.current_credits -= amount
-        user.total_credits_used += amount
-        
-        # 保存
-        self.save_user(user)
-        return True
+        remaining = int(self._consume_credits_script(
+            keys=[self._get_user_key(user_id)],
+            args=[amount]
+        ))
+        if remaining < 0:
+            return False, 0
+        return True, remaining
     
-    def add_credits(self, user_id: str, amount: int) -> bool:
+    def add_credits(self, user_id: str, amount: int) -> Tuple[bool, int]:
         """
         增加用户算力（充值、赠送等）
         
@@ -205,15 +233,15 @@ class BillingService:
             amount: 增加的算力数量
             
         Returns:
-            是否成功
+            (是否成功, 增加后的算力)；用户不存在时为 (False, 0)
         """
-        user = self.get_user(user_id)
-        if not user:
-            return False
-        
-        user.current_credits += amount
-        self.save_user(user)
-        return True
+        total = int(self._add_credits_script(
+            keys=[self._get_user_key(user_id)],
+            args=[amount]
+        ))
+        if total < 0:
+            return False, 0
+        return True, total
     
     def check_and_renew_plan(self, user_id: str) -> bool:
         """
@@ -0,0 +1,82 @@
+"""
+解码图片缓存
+
+同一张源图在一个任务的多个步骤（以及多次重试）中会被反复打开。
+这里按 (绝对路径, mtime_ns, 文件大小) 缓存解码后的 RGB 图片，文件被修改后自动失效。
+缓存按解码后图片的总字节数（宽 × 高 × 3）限制大小，超出 DECODE_CACHE_MAX_MB 时淘汰最久未用的图片。
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+from PIL import Image
+
+from app.core.config import settings
+
+# 缓存内存上限（字节）
+DECODE_CACHE_MAX_BYTES = settings.DECODE_CACHE_MAX_MB * 1024 * 1024
+
+# (路径, mtime_ns, 文件大小) -> 解码后的图片；按最近使用排序
+_cache: "OrderedDict[Tuple[str, int, int], Image.Image]" = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+
+def _decode_rgb(path: str) -> Image.Image:
+    """解码图片为 RGB"""
+    with Image.open(path) as image:
+        return image.convert("RGB")
+
+
+def _image_bytes(image: Image.Image) -> int:
+    """解码后 RGB 图片占用的字节数"""
+    width, height = image.size
+    return width * height * 3
+
+
+def get_decoded(path) -> Image.Image:
+    """
+    获取解码后的 RGB 图片（带缓存）
+    
+    返回的图片在多个调用方之间共享，只能读取；需要原地修改时请先 copy()。
+    
+    Args:
+        path: 图片路径
+    
+    Returns:
+        Image.Image: RGB 图片
+    """
+    global _cache_bytes
+    abs_path = os.path.abspath(path)
+    st = os.stat(abs_path)
+    key = (abs_path, st.st_mtime_ns, st.st_size)
+    
+    with _cache_lock:
+        image = _cache.get(key)
+        if image is not None:
+            _cache.move_to_end(key)
+            return image
+    
+    image = _decode_rgb(abs_path)
+    nbytes = _image_bytes(image)
+    # 单张就超过上限的图片不缓存
+    if nbytes > DECODE_CACHE_MAX_BYTES:
+        return image
+    
+    with _cache_lock:
+        if key not in _cache:
+            _cache[key] = image
+            _cache_bytes += nbytes
+            while _cache_bytes > DECODE_CACHE_MAX_BYTES:
+                _, evicted = _cache.popitem(last=False)
+                _cache_bytes -= _image_bytes(evicted)
+    return image
+
+
+def clear_decode_cache():
+    """清空解码缓存"""
+    global _cache_bytes
+    with _cache_lock:
+        _cache.clear()
+        _cache_bytes = 0
@@ -2,10 +2,14 @@
 Engine 基类
 定义所有 Engine 的通用接口
 """
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 from enum import Enum
 
+import httpx
+
 
 class EngineType(str, Enum):
     """引擎类型枚举"""
@@ -17,6 +21,9 @@ class EngineType(str, Enum):
 class EngineBase(ABC):
     """Engine 基类"""
     
+    # 健康检查结果缓存时间（秒）
+    HEALTH_CACHE_TTL = 10
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         初始化 Engine
@@ -27,6 +34,41 @@ class EngineBase(ABC):
         self.config = config or {}
         self.engine_type: Optional[EngineType] = None
         self.engine_name: str = self.__class__.__name__
+        # 共享 HTTP 客户端（首次使用时创建）
+        self._http: Optional[httpx.Client] = None
+        # 最近一次健康检查：(检查时间, 结果)
+        self._health_cache: Tuple[float, bool] = (0.0, False)
+    
+    @property
+    def http(self) -> httpx.Client:
+        """
+        引擎共享的 HTTP 客户端
+        
+        同一引擎的所有请求复用连接池（启用 HTTP/2），
+        避免每次请求重新建立 TCP/TLS 连接。
+        
+        Returns:
+            httpx.Client: HTTP 客户端
+        """
+        if self._http is None:
+            self._http = httpx.Client(
+                http2=True,
+                timeout=self.get_config("http_timeout", 30),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+            )
+        return self._http
+    
+    def close(self):
+        """关闭引擎持有的 HTTP 连接"""
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
     
     @abstractmethod
     def execute(self, input_data: Any, **kwargs) -> Any:
@@ -57,7 +99,44 @@ class EngineBase(ABC):
     
     def health_check(self) -> bool:
         """
-        健康检查
+        健康检查（结果缓存 HEALTH_CACHE_TTL 秒）
+        
+        Returns:
+            bool: 引擎是否可用
+        """
+        cached = self._get_cached_health()
+        if cached is not None:
+            return cached
+        
+        healthy = self._probe_health()
+        self._health_cache = (time.monotonic(), healthy)
+        return healthy
+    
+    async def ahealth_check(self) -> bool:
+        """
+        异步健康检查（探测在线程中执行，多个引擎可并行检查）
+        
+        Returns:
+            bool: 引擎是否可用
+        """
+        cached = self._get_cached_health()
+        if cached is not None:
+            return cached
+        
+        healthy = await asyncio.to_thread(self._probe_health)
+        self._health_cache = (time.monotonic(), healthy)
+        return healthy
+    
+    def _get_cached_health(self) -> Optional[bool]:
+        """获取未过期的健康检查结果，没有则返回 None"""
+        checked_at, healthy = self._health_cache
+        if checked_at and time.monotonic() - checked_at < self.HEALTH_CACHE_TTL:
+            return healthy
+        return None
+    
+    def _probe_health(self) -> bool:
+        """
+        实际执行健康探测（不带缓存）
         
         Returns:
             bool: 引擎是否可用
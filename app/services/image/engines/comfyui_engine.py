@@ -2,14 +2,88 @@
 ComfyUI Engine
 负责调用本地 ComfyUI 工作流
 """
-import json
-import requests
+import copy
+import httpx
+import io
+import mimetypes
+import os
+import random
+import threading
 import time
 import uuid
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Optional, Callable
+from functools import lru_cache
+from typing import Any, Dict, Optional, Callable, Tuple
+from urllib.parse import urlencode
+
+from PIL import Image, ImageOps
+
+try:
+    import websocket  # websocket-client，可选依赖
+except ImportError:  # pragma: no cover - 未安装时退回轮询
+    websocket = None
 
 from app.services.image.engines.base import EngineBase, EngineType
+from app.utils import json_codec
+from app.utils.file_ops import ensure_dir
+
+
+# 轮询 /history 的初始间隔（秒）
+MIN_POLL_DELAY = 0.2
+
+# 缩放使用的重采样滤镜
+_LANCZOS = Image.Resampling.LANCZOS
+
+# 下载图片时每次写入的块大小
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# 工作流中的非节点字段
+_META_KEYS = frozenset({"nodes", "links", "extra", "config"})
+
+
+def _build_title_index(workflow: Dict) -> Dict[str, str]:
+    """
+    构建节点标题到节点 ID 的索引
+    
+    支持节点列表格式（workflow["nodes"]）和 prompt 格式（以节点 ID 为键）。
+    
+    Args:
+        workflow: 工作流 JSON
+        
+    Returns:
+        Dict[str, str]: 标题 -> 节点 ID
+    """
+    nodes = workflow.get("nodes")
+    if nodes:
+        return {
+            node["title"]: str(node["id"])
+            for node in nodes
+            if node.get("title") and node.get("id") is not None
+        }
+    return {
+        node["title"]: str(node_id)
+        for node_id, node in workflow.items()
+        if isinstance(node, dict) and node.get("title")
+    }
+
+
+@lru_cache(maxsize=8)
+def _load_workflow_cached(path: str, mtime_ns: int) -> Tuple[Dict, Dict[str, str]]:
+    """
+    读取并解析工作流文件（按路径和修改时间缓存）
+    
+    文件被修改后 mtime 变化，会自动重新加载。返回值为共享对象，调用方不得修改。
+    
+    Args:
+        path: 工作流文件路径
+        mtime_ns: 文件修改时间（纳秒）
+        
+    Returns:
+        Tuple[Dict, Dict[str, str]]: (工作流 JSON, 标题 -> 节点 ID 索引)
+    """
+    workflow = json_codec.load_file(path)
+    return workflow, _build_title_index(workflow)
 
 
 class ComfyUIEngine(EngineBase):
@@ -30,9 +104,24 @@ class ComfyUIEngine(EngineBase):
         self.workflow_path = self.get_config("workflow_path")
         self.timeout = self.get_config("timeout", 300)
         self.poll_interval = self.get_config("poll_interval", 2)  # 轮询间隔（秒）
+        # 是否通过 WebSocket 订阅执行事件（不可用时自动退回轮询）
+        self.use_websocket = self.get_config("use_websocket", True)
         
         # 客户端 ID（用于识别）
         self.client_id = str(uuid.uuid4())
+        
+        # 轮询 /history 的条件请求缓存：prompt_id -> ETag / 最近一次的历史记录
+        self._etag_by_prompt: Dict[str, str] = {}
+        self._last_history: Dict[str, Dict] = {}
+        
+        # 已上传图片缓存：(绝对路径, 大小, 修改时间) -> ComfyUI 返回的文件名
+        self._upload_cache: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._upload_cache_size = self.get_config("upload_cache_size", 128)
+        self._upload_cache_lock = threading.Lock()
+        
+        # 上传前压缩：长边超过 max_upload_edge 时缩小并转为 JPEG（设为 0 关闭）
+        self.max_upload_edge = self.get_config("max_upload_edge", 2048)
+        self.upload_quality = self.get_config("upload_quality", 92)
     
     def execute(self, input_data: Any, **kwargs) -> Any:
         """
@@ -52,16 +141,23 @@ class ComfyUIEngine(EngineBase):
             raise ValueError("输入数据验证失败")
         
         # 2. 加载工作流定义
-        workflow = self._load_workflow()
+        # 使用共享模板，_inject_input 只复制需要修改的节点
+        workflow = self._load_workflow(shared=True)
         
         # 3. 注入输入数据
         workflow_with_input = self._inject_input(workflow, input_data, **kwargs)
         
-        # 4. 提交工作流
-        prompt_id = self._submit_workflow(workflow_with_input)
-        
-        # 5. 等待执行完成
-        result = self._wait_for_completion(prompt_id)
+        # 4. 提交前先建立 WebSocket 连接，避免错过执行事件
+        ws = self._open_websocket()
+        try:
+            # 5. 提交工作流
+            prompt_id = self._submit_workflow(workflow_with_input)
+            
+            # 6. 等待执行完成
+            result = self._wait_for_completion(prompt_id, ws)
+        finally:
+            if ws is not None:
+                ws.close()
         
         self._log("ComfyUI 工作流执行成功")
         
@@ -84,16 +180,44 @@ class ComfyUIEngine(EngineBase):
         
         return True
     
-    def _load_workflow(self) -> Dict:
+    def _get_cached_workflow(self) -> Tuple[Dict, Dict[str, str]]:
+        """获取缓存的 (工作流定义, 标题索引)"""
+        mtime_ns = Path(self.workflow_path).stat().st_mtime_ns
+        return _load_workflow_cached(self.workflow_path, mtime_ns)
+    
+    def _get_workflow_template(self) -> Dict:
+        """
+        获取缓存的工作流定义（只读）
+        
+        Returns:
+            Dict: 工作流 JSON（共享对象，不得修改）
+        """
+        return self._get_cached_workflow()[0]
+    
+    def _get_title_index(self) -> Dict[str, str]:
+        """
+        获取缓存的节点标题索引（只读）
+        
+        Returns:
+            Dict[str, str]: 标题 -> 节点 ID
+        """
+        return self._get_cached_workflow()[1]
+    
+    def _load_workflow(self, shared: bool = False) -> Dict:
         """
         加载工作流定义
         
+        Args:
+            shared: 为 True 时直接返回缓存的模板（调用方不得修改），否则返回深拷贝
+            
         Returns:
             Dict: 工作流 JSON
         """
         try:
-            with open(self.workflow_path, 'r', encoding='utf-8') as f:
-                workflow = json.load(f)
+            workflow = self._get_workflow_template()
+            if not shared:
+                # 返回副本，调用方的修改不会影响缓存
+                workflow = copy.deepcopy(workflow)
             
             self._log(f"工作流加载成功: {self.workflow_path}")
             return workflow
@@ -117,9 +241,6 @@ class ComfyUIEngine(EngineBase):
         Returns:
             Dict: 注入后的工作流（prompt 格式，以节点 ID 为键）
         """
-        import os
-        from pathlib import Path
-        
         # 处理输入数据
         if isinstance(input_data, dict):
             # 如果输入是字典，提取图片路径
@@ -135,45 +256,38 @@ class ComfyUIEngine(EngineBase):
         pose_image_path = kwargs.get("pose_image_path") or kwargs.get("reference_image") or pose_image_path
         
         # 转换工作流格式：从节点列表格式转换为 prompt 格式（以节点 ID 为键）
-        prompt = {}
-        nodes = workflow.get("nodes", [])
-        
-        # 如果 workflow 已经是 prompt 格式（以节点 ID 为键），直接使用
-        if not nodes and isinstance(workflow, dict):
-            # 检查是否是 prompt 格式
-            is_prompt_format = all(isinstance(k, (int, str)) and isinstance(v, dict) for k, v in workflow.items() if k not in ["nodes", "links", "extra", "config"])
-            if is_prompt_format:
-                prompt = workflow.copy()
-            else:
-                # 从节点列表构建 prompt
-                for node in workflow.get("nodes", []):
-                    node_id = node.get("id")
-                    if node_id is not None:
-                        prompt[str(node_id)] = node
+        # 节点与 workflow 共享引用，注入前只深拷贝被修改的节点
+        nodes = workflow.get("nodes")
+        if isinstance(nodes, list) and nodes:
+            # 节点列表格式
+            prompt = {
+                str(node["id"]): node
+                for node in nodes
+                if node.get("id") is not None
+            }
         else:
-            # 从节点列表构建 prompt
-            for node in nodes:
-                node_id = node.get("id")
-                if node_id is not None:
-                    prompt[str(node_id)] = node.copy()
-        
-        # 查找输入节点
-        raw_image_node_id = None
-        pose_image_node_id = None
-        
-        for node_id, node in prompt.items():
-            title = node.get("title", "")
-            if title == "input:raw_image:1":
-                raw_image_node_id = node_id
-            elif title == "input:pose_image:2":
-                pose_image_node_id = node_id
+            # 已经是 prompt 格式（以节点 ID 为键），去掉元数据字段
+            prompt = {
+                k: v for k, v in workflow.items()
+                if k not in _META_KEYS and isinstance(v, dict)
+            }
+        
+        # 查找输入节点（通过缓存的标题索引）
+        title_index = self._get_title_index()
+        raw_image_node_id = title_index.get("input:raw_image:1")
+        pose_image_node_id = title_index.get("input:pose_image:2")
+        if raw_image_node_id not in prompt:
+            raw_image_node_id = None
+        if pose_image_node_id not in prompt:
+            pose_image_node_id = None
         
         # 注入原始图片
         if raw_image_path and raw_image_node_id:
             # 上传图片到 ComfyUI
             uploaded_filename = self._upload_image_to_comfyui(raw_image_path)
             if uploaded_filename:
-                # 设置节点输入
+                # 设置节点输入（先复制节点，避免修改共享的工作流模板）
+                prompt[raw_image_node_id] = copy.deepcopy(prompt[raw_image_node_id])
                 if "inputs" not in prompt[raw_image_node_id]:
                     prompt[raw_image_node_id]["inputs"] = {}
                 # LoadImage 节点使用 "image" 字段
@@ -185,7 +299,8 @@ class ComfyUIEngine(EngineBase):
             # 上传图片到 ComfyUI
             uploaded_filename = self._upload_image_to_comfyui(pose_image_path)
             if uploaded_filename:
-                # 设置节点输入
+                # 设置节点输入（先复制节点，避免修改共享的工作流模板）
+                prompt[pose_image_node_id] = copy.deepcopy(prompt[pose_image_node_id])
                 if "inputs" not in prompt[pose_image_node_id]:
                     prompt[pose_image_node_id]["inputs"] = {}
                 prompt[pose_image_node_id]["inputs"]["image"] = uploaded_filename
@@ -212,11 +327,11 @@ class ComfyUIEngine(EngineBase):
             
             # 发送请求
             url = f"{self.comfyui_url}/prompt"
-            response = requests.post(url, json=payload, timeout=30)
+            response = self.http.post(url, json=payload, timeout=30)
             response.raise_for_status()
             
             # 解析响应
-            result = response.json()
+            result = json_codec.loads(response.content)
             prompt_id = result.get("prompt_id")
             
             if not prompt_id:
@@ -226,85 +341,176 @@ class ComfyUIEngine(EngineBase):
             
             return prompt_id
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise Exception(f"提交工作流失败: {e}")
         except Exception as e:
             raise Exception(f"提交工作流异常: {e}")
     
-    def _wait_for_completion(self, prompt_id: str) -> Any:
+    def _get_ws_url(self) -> str:
+        """根据 ComfyUI 地址构建 WebSocket 地址"""
+        if self.comfyui_url.startswith("https://"):
+            base_url = "wss://" + self.comfyui_url[len("https://"):]
+        elif self.comfyui_url.startswith("http://"):
+            base_url = "ws://" + self.comfyui_url[len("http://"):]
+        else:
+            base_url = self.comfyui_url
+        return f"{base_url.rstrip('/')}/ws?clientId={self.client_id}"
+    
+    def _open_websocket(self) -> Optional[Any]:
+        """
+        连接 ComfyUI WebSocket
+        
+        Returns:
+            Optional[Any]: WebSocket 连接，未启用、未安装 websocket-client 或连接失败时返回 None
+        """
+        if not self.use_websocket or websocket is None:
+            return None
+        
+        try:
+            return websocket.create_connection(self._get_ws_url(), timeout=10)
+        except Exception as e:
+            self._log(f"WebSocket 连接失败，改用轮询: {e}", "WARNING")
+            return None
+    
+    def _wait_for_completion(self, prompt_id: str, ws: Optional[Any] = None) -> Any:
         """
         等待工作流执行完成
         
+        优先通过 WebSocket 接收执行事件；连接不可用或中途断开时退回轮询 /history。
+        
         Args:
             prompt_id: Prompt ID
+            ws: 已建立的 WebSocket 连接（可选）
             
         Returns:
             Any: 执行结果
         """
+        try:
+            return self._wait_for_output(prompt_id, ws)
+        finally:
+            # 无论成功与否都清理该 Prompt 的轮询缓存
+            self._etag_by_prompt.pop(prompt_id, None)
+            self._last_history.pop(prompt_id, None)
+    
+    def _wait_for_output(self, prompt_id: str, ws: Optional[Any]) -> Any:
+        """等待执行完成并获取输出（_wait_for_completion 的实现）"""
         start_time = time.time()
         
+        if ws is not None:
+            try:
+                self._wait_via_websocket(ws, prompt_id, start_time + self.timeout)
+                return self._get_output(prompt_id)
+            except TimeoutError:
+                raise
+            except websocket.WebSocketTimeoutException:
+                raise TimeoutError(f"工作流执行超时: {self.timeout}秒")
+            except (websocket.WebSocketException, OSError) as e:
+                self._log(f"WebSocket 连接中断，改用轮询: {e}", "WARNING")
+        
+        # 轮询间隔从 MIN_POLL_DELAY 开始指数增长（带抖动），上限为 poll_interval
+        delay = MIN_POLL_DELAY
+        
         while True:
             # 检查超时
-            if time.time() - start_time > self.timeout:
+            elapsed = time.time() - start_time
+            if elapsed > self.timeout:
                 raise TimeoutError(f"工作流执行超时: {self.timeout}秒")
             
-            # 查询执行状态
-            status = self._get_prompt_status(prompt_id)
+            # 查询执行状态（同一次请求同时拿到历史记录）
+            status, prompt_history = self._poll_history(prompt_id)
             
             if status == "completed":
-                # 获取输出结果
-                result = self._get_output(prompt_id)
-                return result
+                # 直接从本次查询到的历史记录中提取输出，无需再次请求
+                return self._extract_from_history(prompt_history)
             
             elif status == "failed":
                 raise Exception("工作流执行失败")
             
-            elif status == "executing":
-                # 继续等待
-                time.sleep(self.poll_interval)
-            
-            else:
-                # 未知状态
-                time.sleep(self.poll_interval)
+            # 执行中或未知状态：退避后继续等待（不超过剩余时间）
+            time.sleep(min(delay, max(self.timeout - elapsed, 0)))
+            delay = min(self.poll_interval, max(MIN_POLL_DELAY, delay * 1.5 + random.uniform(0, 0.2)))
     
-    def _get_prompt_status(self, prompt_id: str) -> str:
+    def _wait_via_websocket(self, ws: Any, prompt_id: str, deadline: float) -> None:
         """
-        获取 Prompt 执行状态
+        通过 WebSocket 事件等待指定 Prompt 执行结束
+        
+        收到 executing 事件且 node 为空时表示该 Prompt 执行完毕。
+        
+        Args:
+            ws: WebSocket 连接
+            prompt_id: Prompt ID
+            deadline: 截止时间（time.time() 时间戳）
+        """
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise TimeoutError(f"工作流执行超时: {self.timeout}秒")
+            ws.settimeout(remaining)
+            
+            message = ws.recv()
+            if not isinstance(message, str):
+                # 二进制帧是预览图，忽略
+                continue
+            
+            event = json_codec.loads(message)
+            data = event.get("data") or {}
+            if data.get("prompt_id") != prompt_id:
+                continue
+            
+            event_type = event.get("type")
+            if event_type == "executing" and data.get("node") is None:
+                return
+            if event_type == "execution_error":
+                raise Exception(f"工作流执行失败: {data.get('exception_message', '')}")
+    
+    def _poll_history(self, prompt_id: str) -> Tuple[str, Optional[Dict]]:
+        """
+        查询 Prompt 执行状态及其历史记录
         
         Args:
             prompt_id: Prompt ID
             
         Returns:
-            str: 状态（executing / completed / failed）
+            Tuple[str, Optional[Dict]]: (状态 executing / completed / failed, 该 Prompt 的历史记录)
         """
         try:
-            # 查询历史记录
+            # 查询历史记录（带上次的 ETag，未变化时服务端返回 304 且无响应体）
             url = f"{self.comfyui_url}/history/{prompt_id}"
-            response = requests.get(url, timeout=10)
+            headers = {}
+            etag = self._etag_by_prompt.get(prompt_id)
+            if etag:
+                headers["If-None-Match"] = etag
+            response = self.http.get(url, headers=headers, timeout=10)
+            
+            if response.status_code == 304:
+                history = self._last_history.get(prompt_id, {})
+            elif response.status_code == 200:
+                history = json_codec.loads(response.content)
+                self._last_history[prompt_id] = history
+                etag = response.headers.get("ETag")
+                if etag:
+                    self._etag_by_prompt[prompt_id] = etag
+            else:
+                return "executing", None
             
-            if response.status_code == 200:
-                history = response.json()
-                
-                if prompt_id in history:
-                    prompt_history = history[prompt_id]
-                    
-                    # 检查是否有输出
-                    if "outputs" in prompt_history:
-                        return "completed"
-                    
-                    # 检查是否有错误
-                    if "status" in prompt_history:
-                        status_info = prompt_history["status"]
-                        if status_info.get("status_str") == "error":
-                            return "failed"
-                    
-                    return "executing"
-            
-            return "executing"
+            prompt_history = history.get(prompt_id)
+            if prompt_history is None:
+                return "executing", None
+            
+            # 检查是否有输出
+            if "outputs" in prompt_history:
+                return "completed", prompt_history
+            
+            # 检查是否有错误
+            status_info = prompt_history.get("status") or {}
+            if status_info.get("status_str") == "error":
+                return "failed", prompt_history
+            
+            return "executing", prompt_history
             
         except Exception as e:
             self._log(f"查询状态失败: {e}", "WARNING")
-            return "executing"
+            return "executing", None
     
     def _get_output(self, prompt_id: str) -> Any:
         """
@@ -319,15 +525,29 @@ class ComfyUIEngine(EngineBase):
         try:
             # 查询历史记录
             url = f"{self.comfyui_url}/history/{prompt_id}"
-            response = requests.get(url, timeout=10)
+            response = self.http.get(url, timeout=10)
             response.raise_for_status()
             
-            history = response.json()
+            history = json_codec.loads(response.content)
             
             if prompt_id not in history:
                 raise Exception("未找到执行历史")
+        except Exception as e:
+            raise Exception(f"获取输出失败: {e}")
+        
+        return self._extract_from_history(history[prompt_id])
+    
+    def _extract_from_history(self, prompt_history: Dict) -> Any:
+        """
+        从已获取的 Prompt 历史记录中提取输出
+        
+        Args:
+            prompt_history: 单个 Prompt 的历史记录
             
-            prompt_history = history[prompt_id]
+        Returns:
+            Any: 输出数据，包含 output_image 和 comparison_image
+        """
+        try:
             outputs = prompt_history.get("outputs", {})
             
             # 提取输出图片
@@ -357,6 +577,69 @@ class ComfyUIEngine(EngineBase):
         except Exception as e:
             raise Exception(f"获取输出失败: {e}")
     
+    def _view_url(self, filename: str, subfolder: str, image_type: str) -> str:
+        """
+        构建 ComfyUI 图片查看地址（参数经过 URL 编码）
+        
+        Args:
+            filename: 文件名
+            subfolder: 子目录
+            image_type: 图片类型（output / temp 等）
+            
+        Returns:
+            str: /view 完整地址
+        """
+        params = {"filename": filename, "type": image_type}
+        if subfolder:
+            params["subfolder"] = subfolder
+        return f"{self.comfyui_url}/view?{urlencode(params)}"
+    
+    def _image_info(
+        self,
+        image_info: Dict,
+        out_type: str,
+        default_type: str = "output"
+    ) -> Optional[Dict]:
+        """
+        把 ComfyUI 输出的单张图片信息转换为统一格式
+        
+        Args:
+            image_info: ComfyUI 返回的图片信息（filename / subfolder / type）
+            out_type: 图片用途（output / comparison）
+            default_type: 缺少 type 字段时使用的 ComfyUI 图片类型
+            
+        Returns:
+            Optional[Dict]: 图片信息，没有文件名时返回 None
+        """
+        filename = image_info.get("filename")
+        if not filename:
+            return None
+        subfolder = image_info.get("subfolder", "")
+        image_type = image_info.get("type", default_type)
+        return {
+            "type": out_type,
+            "filename": filename,
+            "url": self._view_url(filename, subfolder, image_type),
+            "subfolder": subfolder,
+            "image_type": image_type
+        }
+    
+    def _node_images(
+        self,
+        node_output: Dict,
+        out_type: str,
+        default_type: str = "output"
+    ) -> list:
+        """提取单个输出节点的全部图片信息"""
+        return [
+            info
+            for info in (
+                self._image_info(image_info, out_type, default_type)
+                for image_info in node_output.get("images", [])
+            )
+            if info
+        ]
+    
     def _extract_output_images(self, outputs: Dict) -> list:
         """
         从输出中提取图片信息
@@ -375,109 +658,25 @@ class ComfyUIEngine(EngineBase):
         
         # 需要查询工作流定义来找到输出节点
         try:
-            workflow = self._load_workflow()
-            nodes = workflow.get("nodes", [])
-            
-            # 查找输出节点
-            output_image_node_id = None
-            comparer_image_node_id = None
-            
-            for node in nodes:
-                title = node.get("title", "")
-                node_id = node.get("id")
-                if title == "output:image:1":
-                    output_image_node_id = str(node_id)
-                elif title == "output:image_comparer:2":
-                    comparer_image_node_id = str(node_id)
+            # 查找输出节点（通过缓存的标题索引）
+            title_index = self._get_title_index()
+            output_image_node_id = title_index.get("output:image:1")
+            comparer_image_node_id = title_index.get("output:image_comparer:2")
             
             # 提取输出图片
             if output_image_node_id and output_image_node_id in outputs:
-                node_output = outputs[output_image_node_id]
-                if "images" in node_output:
-                    for image_info in node_output["images"]:
-                        filename = image_info.get("filename")
-                        subfolder = image_info.get("subfolder", "")
-                        image_type = image_info.get("type", "output")
-                        
-                        if filename:
-                            image_url = f"{self.comfyui_url}/view"
-                            params = {
-                                "filename": filename,
-                                "type": image_type
-                            }
-                            if subfolder:
-                                params["subfolder"] = subfolder
-                            
-                            param_str = "&".join([f"{k}={v}" for k, v in params.items()])
-                            full_url = f"{image_url}?{param_str}"
-                            
-                            images.append({
-                                "type": "output",
-                                "filename": filename,
-                                "url": full_url,
-                                "subfolder": subfolder,
-                                "image_type": image_type
-                            })
-            
-            # 提取对比图片
+                images.extend(self._node_images(outputs[output_image_node_id], "output"))
+            
+            # 提取对比图片（comparer 通常使用 temp 类型）
             if comparer_image_node_id and comparer_image_node_id in outputs:
-                node_output = outputs[comparer_image_node_id]
-                if "images" in node_output:
-                    for image_info in node_output["images"]:
-                        filename = image_info.get("filename")
-                        subfolder = image_info.get("subfolder", "")
-                        image_type = image_info.get("type", "temp")  # comparer 通常使用 temp 类型
-                        
-                        if filename:
-                            image_url = f"{self.comfyui_url}/view"
-                            params = {
-                                "filename": filename,
-                                "type": image_type
-                            }
-                            if subfolder:
-                                params["subfolder"] = subfolder
-                            
-                            param_str = "&".join([f"{k}={v}" for k, v in params.items()])
-                            full_url = f"{image_url}?{param_str}"
-                            
-                            images.append({
-                                "type": "comparison",
-                                "filename": filename,
-                                "url": full_url,
-                                "subfolder": subfolder,
-                                "image_type": image_type
-                            })
+                images.extend(self._node_images(outputs[comparer_image_node_id], "comparison", "temp"))
         except Exception as e:
             self._log(f"查找命名输出节点失败，使用默认逻辑: {e}", "WARNING")
         
         # 如果没有找到命名节点，使用原来的逻辑（向后兼容）
         if not images:
-            for node_id, node_output in outputs.items():
-                if "images" in node_output:
-                    for image_info in node_output["images"]:
-                        filename = image_info.get("filename")
-                        subfolder = image_info.get("subfolder", "")
-                        image_type = image_info.get("type", "output")
-                        
-                        if filename:
-                            image_url = f"{self.comfyui_url}/view"
-                            params = {
-                                "filename": filename,
-                                "type": image_type
-                            }
-                            if subfolder:
-                                params["subfolder"] = subfolder
-                            
-                            param_str = "&".join([f"{k}={v}" for k, v in params.items()])
-                            full_url = f"{image_url}?{param_str}"
-                            
-                            images.append({
-                                "type": "output",
-                                "filename": filename,
-                                "url": full_url,
-                                "subfolder": subfolder,
-                                "image_type": image_type
-                            })
+            for node_output in outputs.values():
+                images.extend(self._node_images(node_output, "output"))
         
         return images
     
@@ -497,14 +696,13 @@ class ComfyUIEngine(EngineBase):
             if not url:
                 raise ValueError("图片信息中没有 URL")
             
-            # 下载图片
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            
-            # 保存图片
-            Path(save_path).parent.mkdir(parents=True, exist_ok=True)
-            with open(save_path, 'wb') as f:
-                f.write(response.content)
+            # 流式下载并写入磁盘（不在内存中保留整张图片）
+            with self.http.stream("GET", url, timeout=30) as response:
+                response.raise_for_status()
+                ensure_dir(Path(save_path).parent)
+                with open(save_path, 'wb') as f:
+                    for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
             
             self._log(f"图片已下载: {save_path}")
             
@@ -513,6 +711,43 @@ class ComfyUIEngine(EngineBase):
         except Exception as e:
             raise Exception(f"下载图片失败: {e}")
     
+    def _shrink_for_upload(self, image_path: str) -> Optional[Tuple[str, bytes]]:
+        """
+        长边超过 max_upload_edge 的图片在上传前缩小并重新编码为 JPEG
+        
+        重新编码会丢失 EXIF，因此先按 EXIF Orientation 转正；
+        带透明通道的图片保持原样上传（ComfyUI 的 LoadImage 会把 alpha 用作遮罩）。
+        
+        Args:
+            image_path: 本地图片路径
+            
+        Returns:
+            Optional[Tuple[str, bytes]]: (上传文件名, JPEG 数据)，无需缩小时返回 None
+        """
+        if not self.max_upload_edge:
+            return None
+        
+        with Image.open(image_path) as img:
+            if max(img.size) <= self.max_upload_edge:
+                return None
+            if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+                return None
+            
+            target = (self.max_upload_edge, self.max_upload_edge)
+            # JPEG 可在解码时直接按比例缩小，减少解码开销
+            img.draft("RGB", target)
+            # 与 LoadImage 的 exif_transpose 保持一致，避免手机照片上传后方向错误
+            img = ImageOps.exif_transpose(img)
+            img = img.convert("RGB")
+            img.thumbnail(target, _LANCZOS)
+            
+            buffer = io.BytesIO()
+            img.save(buffer, format="JPEG", quality=self.upload_quality, optimize=True)
+        
+        filename = f"{Path(image_path).stem}.jpg"
+        self._log(f"上传前已缩小图片: {image_path} -> {img.size}")
+        return filename, buffer.getvalue()
+    
     def _upload_image_to_comfyui(self, image_path: str) -> Optional[str]:
         """
         上传图片到 ComfyUI
@@ -523,34 +758,54 @@ class ComfyUIEngine(EngineBase):
         Returns:
             Optional[str]: 上传后的文件名，失败返回 None
         """
-        import os
-        from pathlib import Path
-        
         try:
             # 检查文件是否存在
-            if not os.path.exists(image_path):
+            try:
+                stat = os.stat(image_path)
+            except FileNotFoundError:
                 self._log(f"图片文件不存在: {image_path}", "ERROR")
                 return None
             
-            # 读取图片文件
-            with open(image_path, 'rb') as f:
-                image_data = f.read()
+            # 同一文件（路径、大小、修改时间均未变）已上传过则直接复用
+            cache_key = (os.path.abspath(image_path), stat.st_size, stat.st_mtime_ns)
+            with self._upload_cache_lock:
+                cached_filename = self._upload_cache.get(cache_key)
+                if cached_filename is not None:
+                    self._upload_cache.move_to_end(cache_key)
+            if cached_filename is not None:
+                self._log(f"图片已上传过，复用 ComfyUI 文件: {cached_filename}")
+                return cached_filename
             
-            # 获取文件名
-            filename = os.path.basename(image_path)
-            
-            # 上传到 ComfyUI
             url = f"{self.comfyui_url}/upload/image"
-            files = {
-                "image": (filename, image_data, "image/jpeg")
-            }
-            
-            response = requests.post(url, files=files, timeout=30)
+            shrunk = self._shrink_for_upload(image_path)
+            if shrunk is not None:
+                # 大图：上传缩小后的 JPEG
+                filename, image_data = shrunk
+                files = {
+                    "image": (filename, image_data, "image/jpeg")
+                }
+                response = self.http.post(url, files=files, timeout=30)
+            else:
+                # 获取文件名和 MIME 类型
+                filename = os.path.basename(image_path)
+                content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+                
+                # 上传到 ComfyUI（直接传文件句柄，由客户端分块读取发送）
+                with open(image_path, 'rb') as f:
+                    files = {
+                        "image": (filename, f, content_type)
+                    }
+                    response = self.http.post(url, files=files, timeout=30)
             response.raise_for_status()
             
-            result = response.json()
+            result = json_codec.loads(response.content)
             uploaded_filename = result.get("name") or filename
             
+            with self._upload_cache_lock:
+                self._upload_cache[cache_key] = uploaded_filename
+                while len(self._upload_cache) > self._upload_cache_size:
+                    self._upload_cache.popitem(last=False)
+            
             self._log(f"图片已上传到 ComfyUI: {uploaded_filename}")
             return uploaded_filename
             
@@ -558,9 +813,9 @@ class ComfyUIEngine(EngineBase):
             self._log(f"上传图片到 ComfyUI 失败: {e}", "ERROR")
             return None
     
-    def health_check(self) -> bool:
+    def _probe_health(self) -> bool:
         """
-        健康检查
+        健康探测
         
         Returns:
             bool: ComfyUI 是否可用
@@ -572,7 +827,7 @@ class ComfyUIEngine(EngineBase):
             
             # 尝试访问 ComfyUI
             url = f"{self.comfyui_url}/system_stats"
-            response = requests.get(url, timeout=5)
+            response = self.http.get(url, timeout=2)
             
             return response.status_code == 200
             
@@ -2,13 +2,36 @@
 外部 API Engine
 负责调用闭源模型 API
 """
-import requests
-import time
+import asyncio
+import random
+import re
+import httpx
+from pathlib import Path
 from typing import Any, Dict, Optional
 
 from app.services.image.engines.base import EngineBase, EngineType
 from app.utils.image_io import image_to_base64, base64_to_image
 
+# base64 字符集（用于快速判断结果是否可能是 base64 图片）
+_BASE64_CHARS_RE = re.compile(r"[A-Za-z0-9+/=\s]+")
+
+
+def _looks_like_b64(value: str) -> bool:
+    """
+    粗略判断字符串是否为 base64 图片（data URI 或纯 base64 文本）
+    
+    只检查前缀，不做完整解码；URL、普通文本等会被直接排除。
+    
+    Args:
+        value: 待判断字符串
+        
+    Returns:
+        bool: 是否可能是 base64 图片
+    """
+    if value.startswith("data:image/"):
+        return True
+    return len(value) > 32 and _BASE64_CHARS_RE.fullmatch(value[:128]) is not None
+
 
 class ExternalApiEngine(EngineBase):
     """外部 API Engine"""
@@ -25,20 +48,53 @@ class ExternalApiEngine(EngineBase):
         
         # 从配置中获取 API 信息
         self.api_url = self.get_config("api_url")
-        self.api_key = self.get_config("api_key")
+        self.api_key = self.get_config("api_key")  # 同时构建请求头
         self.timeout = self.get_config("timeout", 60)
         self.retry_times = self.get_config("retry_times", 3)
         self.retry_delay = self.get_config("retry_delay", 2)
         
         # 请求方法（GET/POST）
         self.method = self.get_config("method", "POST").upper()
+        # 按请求方法选定发送函数，调用时无需再分支判断
+        self._send = {
+            "POST": self._send_post,
+            "GET": self._send_get,
+        }.get(self.method, self._send_unsupported)
         
         # 是否需要图片 base64 编码
         self.encode_images = self.get_config("encode_images", True)
+        
+        # 异步 HTTP 客户端（首次请求时创建，绑定到当前事件循环）
+        self._client: Optional[httpx.AsyncClient] = None
     
     def execute(self, input_data: Any, **kwargs) -> Any:
         """
-        执行 API 调用
+        执行 API 调用（同步入口）
+        
+        在新的事件循环中运行 aexecute，结束后关闭客户端。
+        已在事件循环中的调用方应直接 await aexecute。
+        
+        Args:
+            input_data: 输入数据（可以是字典或图片路径）
+            **kwargs: 其他参数
+            
+        Returns:
+            Any: API 响应结果
+        """
+        return asyncio.run(self._execute_and_close(input_data, **kwargs))
+    
+    async def _execute_and_close(self, input_data: Any, **kwargs) -> Any:
+        """执行一次调用并关闭客户端（客户端不能跨事件循环复用）"""
+        try:
+            return await self.aexecute(input_data, **kwargs)
+        finally:
+            await self.aclose()
+    
+    async def aexecute(self, input_data: Any, **kwargs) -> Any:
+        """
+        执行 API 调用（异步）
+        
+        多个调用可在同一事件循环中并发执行，网络等待互相重叠。
         
         Args:
             input_data: 输入数据（可以是字典或图片路径）
@@ -57,7 +113,7 @@ class ExternalApiEngine(EngineBase):
         request_data = self._prepare_request(input_data, **kwargs)
         
         # 3. 带重试的 API 调用
-        response = self._call_api_with_retry(request_data)
+        response = await self._call_api_with_retry(request_data)
         
         # 4. 解析响应
         result = self._parse_response(response)
@@ -87,7 +143,6 @@ class ExternalApiEngine(EngineBase):
         
         # 如果是字符串（图片路径），检查文件是否存在
         if isinstance(input_data, str):
-            from pathlib import Path
             return Path(input_data).exists()
         
         return True
@@ -122,51 +177,79 @@ class ExternalApiEngine(EngineBase):
         
         return request_data
     
-    def _call_api(self, request_data: Dict) -> Any:
+    @property
+    def api_key(self) -> Optional[str]:
+        """API 密钥"""
+        return self._api_key
+    
+    @api_key.setter
+    def api_key(self, value: Optional[str]):
+        """更新 API 密钥并重新构建请求头"""
+        self._api_key = value
+        self._headers = self._build_headers()
+    
+    def _build_headers(self) -> Dict[str, str]:
         """
-        调用 API
+        构建请求头（只在初始化或密钥变更时执行）
         
-        Args:
-            request_data: 请求数据
-            
         Returns:
-            Any: API 响应
+            Dict[str, str]: 请求头
         """
-        # 构建请求头
         headers = {
             "Content-Type": "application/json"
         }
         
         # 添加认证信息
-        if self.api_key:
+        if self._api_key:
             auth_type = self.get_config("auth_type", "Bearer")
             if auth_type == "Bearer":
-                headers["Authorization"] = f"Bearer {self.api_key}"
+                headers["Authorization"] = f"Bearer {self._api_key}"
             elif auth_type == "ApiKey":
-                headers["X-API-Key"] = self.api_key
+                headers["X-API-Key"] = self._api_key
             elif auth_type == "Custom":
                 # 自定义认证头
                 auth_header = self.get_config("auth_header", "Authorization")
-                headers[auth_header] = self.api_key
+                headers[auth_header] = self._api_key
         
+        return headers
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """获取异步 HTTP 客户端（懒加载，启用 HTTP/2）"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout, http2=True)
+        return self._client
+    
+    async def aclose(self):
+        """关闭异步 HTTP 客户端（同步客户端由 close() 关闭）"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _send_post(self, request_data: Dict) -> httpx.Response:
+        """以 JSON 请求体发送 POST 请求"""
+        return await self._get_client().post(self.api_url, json=request_data, headers=self._headers)
+    
+    async def _send_get(self, request_data: Dict) -> httpx.Response:
+        """以查询参数发送 GET 请求"""
+        return await self._get_client().get(self.api_url, params=request_data, headers=self._headers)
+    
+    async def _send_unsupported(self, request_data: Dict) -> httpx.Response:
+        """配置了不支持的请求方法"""
+        raise ValueError(f"不支持的请求方法: {self.method}")
+    
+    async def _call_api(self, request_data: Dict) -> Any:
+        """
+        调用 API
+        
+        Args:
+            request_data: 请求数据
+            
+        Returns:
+            Any: API 响应
+        """
         try:
             # 发送请求
-            if self.method == "POST":
-                response = requests.post(
-                    self.api_url,
-                    json=request_data,
-                    headers=headers,
-                    timeout=self.timeout
-                )
-            elif self.method == "GET":
-                response = requests.get(
-                    self.api_url,
-                    params=request_data,
-                    headers=headers,
-                    timeout=self.timeout
-                )
-            else:
-                raise ValueError(f"不支持的请求方法: {self.method}")
+            response = await self._send(request_data)
             
             # 检查响应状态
             response.raise_for_status()
@@ -174,14 +257,14 @@ class ExternalApiEngine(EngineBase):
             # 返回 JSON 响应
             return response.json()
             
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             raise Exception(f"API 请求超时: {self.api_url}")
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             raise Exception(f"API 请求失败: {e.response.status_code}, {e.response.text}")
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise Exception(f"API 请求异常: {str(e)}")
     
-    def _call_api_with_retry(self, request_data: Dict) -> Any:
+    async def _call_api_with_retry(self, request_data: Dict) -> Any:
         """
         带重试的 API 调用
         
@@ -195,13 +278,14 @@ class ExternalApiEngine(EngineBase):
         
         for attempt in range(self.retry_times):
             try:
-                return self._call_api(request_data)
+                return await self._call_api(request_data)
             except Exception as e:
                 last_exception = e
                 self._log(f"API 调用失败（第 {attempt + 1}/{self.retry_times} 次）: {e}", "WARNING")
                 
                 if attempt < self.retry_times - 1:
-                    time.sleep(self.retry_delay)
+                    # 指数退避 + 随机抖动，避免多个任务同时重试
+                    await asyncio.sleep(self.retry_delay * (2 ** attempt) + random.random() * 0.1)
         
         # 所有重试都失败
         raise Exception(f"API 调用失败（已重试 {self.retry_times} 次）: {last_exception}")
@@ -235,21 +319,34 @@ class ExternalApiEngine(EngineBase):
         # 如果结果是 base64 图片，解码
         if self.get_config("decode_result", False):
             if isinstance(result, str):
-                try:
-                    result = base64_to_image(result)
-                except Exception:
-                    pass  # 如果不是 base64，保持原样
-            elif isinstance(result, dict) and "image" in result:
-                try:
-                    result["image"] = base64_to_image(result["image"])
-                except Exception:
-                    pass
+                result = self._decode_image(result)
+            elif isinstance(result, dict) and isinstance(result.get("image"), str):
+                result["image"] = self._decode_image(result["image"])
         
         return result
     
-    def health_check(self) -> bool:
+    def _decode_image(self, value: str) -> Any:
+        """
+        把 base64 图片解码为 PIL Image（不像 base64 的字符串原样返回）
+        
+        Args:
+            value: 响应中的字符串结果
+            
+        Returns:
+            Any: 解码后的图片，或原字符串
+        """
+        if not _looks_like_b64(value):
+            return value
+        
+        try:
+            return base64_to_image(value)
+        except ValueError as e:
+            self._log(f"结果看起来是 base64 但解码失败，保持原样: {e}", "WARNING")
+            return value
+    
+    def _probe_health(self) -> bool:
         """
-        健康检查
+        健康探测
         
         Returns:
             bool: API 是否可用
@@ -262,7 +359,7 @@ class ExternalApiEngine(EngineBase):
             # 尝试发送健康检查请求
             health_url = self.get_config("health_check_url")
             if health_url:
-                response = requests.get(health_url, timeout=5)
+                response = self.http.get(health_url, timeout=2)
                 return response.status_code == 200
             
             return True
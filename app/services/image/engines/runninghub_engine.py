@@ -8,6 +8,7 @@ import time
 from typing import Any, Dict, Optional
 
 from app.services.image.engines.base import EngineBase, EngineType
+from app.utils.file_ops import ensure_dir
 
 
 class RunningHubEngine(EngineBase):
@@ -632,7 +633,7 @@ class RunningHubEngine(EngineBase):
             response.raise_for_status()
             
             # 保存图片
-            Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+            ensure_dir(Path(save_path).parent)
             with open(save_path, 'wb') as f:
                 f.write(response.content)
             
@@ -1,17 +1,27 @@
 """
 图像编辑相关的枚举定义
 """
+import sys
 from enum import Enum
 
+if sys.version_info >= (3, 11):
+    from enum import StrEnum
+else:
+    class StrEnum(str, Enum):
+        """Python 3.11 以下的 StrEnum 兼容实现（成员即字符串值）"""
+        
+        def __str__(self) -> str:
+            return self.value
 
-class EditMode(str, Enum):
+
+class EditMode(StrEnum):
     """图像编辑模式"""
     HEAD_SWAP = "HEAD_SWAP"                    # 换头
     BACKGROUND_CHANGE = "BACKGROUND_CHANGE"    # 换背景
     POSE_CHANGE = "POSE_CHANGE"                # 换姿势
 
 
-class ProcessingStep(str, Enum):
+class ProcessingStep(StrEnum):
     """处理步骤枚举"""
     # 通用步骤
     INIT = "init"                              # 初始化
@@ -38,7 +48,7 @@ class ProcessingStep(str, Enum):
     REFINE_RESULT = "refine_result"            # 优化结果
 
 
-class ImageQuality(str, Enum):
+class ImageQuality(StrEnum):
     """图像质量等级"""
     LOW = "low"          # 低质量（快速）
     MEDIUM = "medium"    # 中等质量（平衡）
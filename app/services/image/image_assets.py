@@ -3,14 +3,20 @@
 """
 from __future__ import annotations
 
-import shutil
 import os
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
-from PIL import Image, ImageDraw
+from PIL import Image
 
 from app.core.config import settings
+from app.services.image.decode_cache import get_decoded
+from app.services.storage.file_index import get_file_index
+from app.utils.file_ops import copy_file, ensure_dir
+from app.utils.image_io import resize_lanczos
 
 # 获取上传目录 - 支持相对路径和绝对路径
 def _get_upload_dir() -> Path:
@@ -46,6 +52,79 @@ RESULTS_DIR = Path(settings.RESULT_DIR)
 UPLOAD_DIR = _get_upload_dir()
 UPLOAD_SUBDIRS = ("source", "reference", "other")
 
+# 对比图 JPEG 编码参数
+COMPARISON_JPEG_QUALITY = 90
+COMPARISON_WRITE_BUFFER = 1 << 20
+
+# file_id -> (已定位的文件路径, 上次确认存在的时间)
+# 上传文件写入后文件名不再变化，TTL 内命中直接返回；超过 TTL 再 stat 一次确认文件仍在
+_RESOLVE_CACHE_SIZE = 4096
+_RESOLVE_CACHE_TTL = 30.0
+_resolve_cache: "OrderedDict[str, Tuple[Path, float]]" = OrderedDict()
+_resolve_cache_lock = threading.Lock()
+
+
+def _get_cached_path(file_id: str) -> Optional[Path]:
+    """读取定位缓存，文件已不存在时清除该条目"""
+    with _resolve_cache_lock:
+        entry = _resolve_cache.get(file_id)
+        if entry is None:
+            return None
+        _resolve_cache.move_to_end(file_id)
+    
+    cached, verified_at = entry
+    now = time.monotonic()
+    if now - verified_at < _RESOLVE_CACHE_TTL:
+        return cached
+    
+    if not os.path.isfile(cached):
+        with _resolve_cache_lock:
+            _resolve_cache.pop(file_id, None)
+        return None
+    with _resolve_cache_lock:
+        if file_id in _resolve_cache:
+            _resolve_cache[file_id] = (cached, now)
+    return cached
+
+
+def _cache_path(file_id: str, path: Path) -> Path:
+    """写入定位缓存（超过上限时淘汰最久未使用的条目）"""
+    with _resolve_cache_lock:
+        _resolve_cache[file_id] = (path, time.monotonic())
+        _resolve_cache.move_to_end(file_id)
+        while len(_resolve_cache) > _RESOLVE_CACHE_SIZE:
+            _resolve_cache.popitem(last=False)
+    return path
+
+
+def _scan_for_prefix(folder: Path, prefix: str) -> Optional[Path]:
+    """
+    扫描单个目录，返回第一个文件名以 prefix 开头的文件
+    
+    Args:
+        folder: 目录
+        prefix: 文件名前缀（如 "img_abc123."）
+    Returns:
+        Optional[Path]: 文件路径，未找到或目录不存在时返回 None
+    """
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.startswith(prefix) and entry.is_file():
+                    return Path(entry.path)
+    except (FileNotFoundError, NotADirectoryError):
+        pass
+    return None
+
+
+def _walk_for_prefix(root: Path, prefix: str) -> Optional[Path]:
+    """递归查找第一个文件名以 prefix 开头的文件"""
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.startswith(prefix):
+                return Path(dirpath) / name
+    return None
+
 
 def resolve_uploaded_file(file_id: str) -> Path:
     """
@@ -71,24 +150,40 @@ def resolve_uploaded_file(file_id: str) -> Path:
         print(f"[resolve_uploaded_file] ✅ 使用直接路径: {file_path}")
         return file_path
     
+    cached = _get_cached_path(file_id)
+    if cached is not None:
+        print(f"[resolve_uploaded_file] ✅ 命中缓存: {cached}")
+        return cached
+    
     # Standard flow: search in UPLOAD_DIR
     if not UPLOAD_DIR.exists():
         print(f"[resolve_uploaded_file] ❌ 上传目录不存在: {UPLOAD_DIR}")
         raise FileNotFoundError(f"上传目录不存在: {UPLOAD_DIR}")
 
+    # 优先查询上传时写入的索引（一次索引查询 + 一次 stat）
+    file_index = get_file_index()
+    relpath = file_index.lookup(file_id)
+    if relpath is not None:
+        indexed = UPLOAD_DIR / relpath
+        if os.path.isfile(indexed):
+            print(f"[resolve_uploaded_file] ✅ 命中索引: {indexed}")
+            return _cache_path(file_id, indexed)
+
     print(f"[resolve_uploaded_file] 🔍 在上传目录搜索，子目录: {UPLOAD_SUBDIRS}")
-    search_patterns = [UPLOAD_DIR / sub for sub in UPLOAD_SUBDIRS if (UPLOAD_DIR / sub).exists()]
-    print(f"[resolve_uploaded_file] 可用的搜索目录: {search_patterns}")
+    prefix = f"{file_id}."
     
     candidates: list[Path] = []
-    for folder in search_patterns:
-        matches = list(folder.glob(f"{file_id}.*"))
-        print(f"[resolve_uploaded_file] 在 {folder} 中搜索 '{file_id}.*': 找到 {len(matches)} 个文件")
-        candidates.extend(matches)
+    for sub in UPLOAD_SUBDIRS:
+        match = _scan_for_prefix(UPLOAD_DIR / sub, prefix)
+        if match is not None:
+            candidates.append(match)
+            break
 
     if not candidates:
-        candidates = list(UPLOAD_DIR.glob(f"**/{file_id}.*"))
-        print(f"[resolve_uploaded_file] 递归搜索 '{file_id}.*': 找到 {len(candidates)} 个文件")
+        match = _walk_for_prefix(UPLOAD_DIR, prefix)
+        print(f"[resolve_uploaded_file] 递归搜索 '{prefix}*': {'找到' if match else '未找到'}")
+        if match is not None:
+            candidates.append(match)
 
     # If still not found, try test_image directory (for local testing)
     if not candidates:
@@ -98,12 +193,12 @@ def resolve_uploaded_file(file_id: str) -> Path:
             test_file = test_image_dir / file_id
             if test_file.exists():
                 print(f"[resolve_uploaded_file] ✅ 使用测试图片: {test_file}")
-                return test_file
+                return _cache_path(file_id, test_file)
             # Try with wildcard (e.g., "test_001" → "test_001.jpg")
             test_candidates = list(test_image_dir.glob(f"{file_id}.*"))
             if test_candidates:
                 print(f"[resolve_uploaded_file] ✅ 使用测试图片: {test_candidates[0]}")
-                return test_candidates[0]
+                return _cache_path(file_id, test_candidates[0])
 
     if not candidates:
         print(f"[resolve_uploaded_file] ❌ 未找到文件: {file_id}")
@@ -111,7 +206,9 @@ def resolve_uploaded_file(file_id: str) -> Path:
 
     result_path = candidates[0]
     print(f"[resolve_uploaded_file] ✅ 找到文件: {result_path}")
-    return result_path
+    # 索引缺失或过期：用扫描结果修复
+    file_index.record(file_id, os.path.relpath(result_path, UPLOAD_DIR))
+    return _cache_path(file_id, result_path)
 
 
 def copy_image_to_results(source_path: Path, filename: Optional[str] = None) -> Path:
@@ -123,13 +220,13 @@ def copy_image_to_results(source_path: Path, filename: Optional[str] = None) ->
     Returns:
         Path: 新文件路径
     """
-    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    ensure_dir(RESULTS_DIR)
     extension = source_path.suffix.lower() or ".jpg"
     target_name = filename or f"{source_path.stem}{extension}"
     if not target_name.lower().endswith(extension):
         target_name = f"{target_name}{extension}"
     target_path = RESULTS_DIR / target_name
-    shutil.copyfile(source_path, target_path)
+    copy_file(source_path, target_path)
     return target_path
 
 
@@ -143,25 +240,41 @@ def create_comparison_image(before_path: Path, after_path: Path, filename: str)
     Returns:
         Path: 生成文件路径
     """
-    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
-    before = Image.open(before_path).convert("RGB")
-    after = Image.open(after_path).convert("RGB")
+    ensure_dir(RESULTS_DIR)
+    # 原图在同一任务的多个步骤间复用，走解码缓存
+    before = get_decoded(before_path)
+    if os.path.samefile(before_path, after_path):
+        # 同一张图（如没有参考图时）只解码一次
+        after = before
+    else:
+        after = Image.open(after_path).convert("RGB")
 
     target_height = max(before.height, after.height)
     before = _resize_with_height(before, target_height)
     after = _resize_with_height(after, target_height)
 
-    canvas = Image.new("RGB", (before.width + after.width, target_height), color=(0, 0, 0))
+    # 两张图高度相同，会覆盖整个画布，因此不预先填充底色
+    canvas = Image.new("RGB", (before.width + after.width, target_height), color=None)
     canvas.paste(before, (0, 0))
     canvas.paste(after, (before.width, 0))
 
+    # 分隔线：6px 白边 + 2px 黑芯，各区域只写一次
     divider_x = before.width
-    draw = ImageDraw.Draw(canvas)
-    draw.line([(divider_x, 0), (divider_x, target_height)], fill=(255, 255, 255), width=6)
-    draw.line([(divider_x, 0), (divider_x, target_height)], fill=(0, 0, 0), width=2)
+    canvas.paste((255, 255, 255), (divider_x - 3, 0, divider_x - 1, target_height))
+    canvas.paste((0, 0, 0), (divider_x - 1, 0, divider_x + 1, target_height))
+    canvas.paste((255, 255, 255), (divider_x + 1, 0, divider_x + 3, target_height))
 
+    # 对比图仅用于预览：单遍编码 + 4:2:0 色度采样，写入经大缓冲区一次落盘
     target_path = RESULTS_DIR / filename
-    canvas.save(target_path, format="JPEG", quality=95)
+    with open(target_path, "wb", buffering=COMPARISON_WRITE_BUFFER) as f:
+        canvas.save(
+            f,
+            format="JPEG",
+            quality=COMPARISON_JPEG_QUALITY,
+            optimize=False,
+            progressive=False,
+            subsampling=2
+        )
     return target_path
 
 
@@ -171,5 +284,5 @@ def _resize_with_height(image: Image.Image, target_height: int) -> Image.Image:
         return image
     ratio = target_height / image.height
     target_width = max(1, int(image.width * ratio))
-    return image.resize((target_width, target_height), Image.Resampling.LANCZOS)
+    return resize_lanczos(image, (target_width, target_height))
 
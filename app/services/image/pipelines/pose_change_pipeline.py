@@ -12,6 +12,7 @@ from app.services.image.engines.registry import get_engine_registry
 from app.services.image.image_assets import resolve_uploaded_file, copy_image_to_results
 from app.core.config import settings
 from app.core.error_codes import TaskErrorCode
+from app.utils.file_ops import ensure_dir
 
 
 class PoseChangePipeline(PipelineBase):
@@ -266,7 +267,7 @@ class PoseChangePipeline(PipelineBase):
             # 保存输出图片
             output_filename = f"{task_id}_output.jpg"
             output_path = Path(settings.RESULT_DIR) / output_filename
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+            ensure_dir(output_path.parent)
             
             # 从响应中读取图片并保存
             output_img = Image.open(io.BytesIO(response.content))
@@ -2,6 +2,7 @@
 存储服务模块
 """
 from app.services.storage.local_storage import LocalStorage, get_local_storage
+from app.services.storage.file_index import FileIndex, get_file_index
 
-__all__ = ["LocalStorage", "get_local_storage"]
+__all__ = ["LocalStorage", "get_local_storage", "FileIndex", "get_file_index"]
 
@@ -0,0 +1,108 @@
+"""
+上传文件索引（file_id -> 相对路径）
+
+上传时写入，按 file_id 定位文件时一次索引查询即可，无需遍历上传目录。
+索引保存在 FILE_INDEX_PATH 指定的 SQLite 文件中（不在对外提供静态访问的上传目录下），
+进程重启后仍然有效。
+"""
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.utils.file_ops import ensure_dir
+
+
+class FileIndex:
+    """基于 SQLite 的上传文件索引（每个线程持有独立连接）"""
+    
+    def __init__(self, db_path: str):
+        """
+        初始化文件索引
+        
+        Args:
+            db_path: 索引数据库文件路径（索引中的路径都相对于上传目录）
+        """
+        self.db_path = str(db_path)
+        self._local = threading.local()
+    
+    def _get_conn(self) -> sqlite3.Connection:
+        """获取当前线程的连接（首次使用时建表）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            ensure_dir(os.path.dirname(self.db_path) or ".")
+            conn = sqlite3.connect(self.db_path, timeout=5)
+            # WAL 模式下读写互不阻塞，NORMAL 同步级别避免每次提交都 fsync
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "file_id TEXT PRIMARY KEY, relpath TEXT NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+    
+    def record(self, file_id: str, relpath: str):
+        """
+        记录 file_id 对应的相对路径（已存在时覆盖）
+        
+        Args:
+            file_id: 文件 ID
+            relpath: 相对于上传目录的路径
+        """
+        try:
+            conn = self._get_conn()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO files (file_id, relpath) VALUES (?, ?)",
+                    (file_id, relpath)
+                )
+        except sqlite3.Error as e:
+            # 索引只是加速手段，写入失败不影响上传本身
+            print(f"[FileIndex] 写入索引失败: {file_id}, 错误: {e}")
+    
+    def lookup(self, file_id: str) -> Optional[str]:
+        """
+        查询 file_id 对应的相对路径
+        
+        Args:
+            file_id: 文件 ID
+        
+        Returns:
+            Optional[str]: 相对路径，未记录或查询失败时返回 None
+        """
+        try:
+            row = self._get_conn().execute(
+                "SELECT relpath FROM files WHERE file_id = ?", (file_id,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"[FileIndex] 查询索引失败: {file_id}, 错误: {e}")
+            return None
+        return row[0] if row else None
+
+
+# 索引文件路径 -> 索引实例
+_file_indexes: Dict[str, FileIndex] = {}
+_file_indexes_lock = threading.Lock()
+
+
+def get_file_index(db_path: Optional[str] = None) -> FileIndex:
+    """
+    获取文件索引（每个索引文件一个实例）
+    
+    Args:
+        db_path: 索引数据库文件路径，默认使用 settings.FILE_INDEX_PATH
+    
+    Returns:
+        FileIndex: 文件索引实例
+    """
+    key = os.path.abspath(str(db_path or settings.FILE_INDEX_PATH))
+    index = _file_indexes.get(key)
+    if index is None:
+        with _file_indexes_lock:
+            index = _file_indexes.get(key)
+            if index is None:
+                index = FileIndex(key)
+                _file_indexes[key] = index
+    return index
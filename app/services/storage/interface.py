@@ -1,8 +1,9 @@
 """
 存储接口定义
 """
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import BinaryIO, List, Optional, Tuple
 
 
 class StorageInterface(ABC):
@@ -28,6 +29,46 @@ class StorageInterface(ABC):
         """
         pass
     
+    async def save_files(
+        self,
+        files: List[Tuple[bytes, str]],
+        subdirectory: Optional[str] = None
+    ) -> List[str]:
+        """
+        批量保存文件（并发提交所有写入）
+        
+        Args:
+            files: (文件二进制数据, 文件名) 列表
+            subdirectory: 子目录
+            
+        Returns:
+            List[str]: 文件路径列表（与输入顺序一致）
+        """
+        return list(await asyncio.gather(*(
+            self.save_file(file_data, filename, subdirectory)
+            for file_data, filename in files
+        )))
+    
+    @abstractmethod
+    async def save_fileobj(
+        self,
+        file_obj: BinaryIO,
+        filename: str,
+        subdirectory: Optional[str] = None
+    ) -> str:
+        """
+        从文件对象流式保存文件（不把整个文件读入内存）
+        
+        Args:
+            file_obj: 可读的二进制文件对象
+            filename: 文件名
+            subdirectory: 子目录
+            
+        Returns:
+            str: 文件路径
+        """
+        pass
+    
     @abstractmethod
     async def get_file(self, file_path: str) -> bytes:
         """
@@ -1,13 +1,34 @@
 """
 本地文件系统存储实现
 """
+import asyncio
+import atexit
+import io
 import os
+import shutil
+import threading
+import time
 import aiofiles
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
 
 from app.services.storage.interface import StorageInterface
 from app.core.config import settings
+from app.utils.file_ops import ensure_dir, forget_dir
+
+# 流式写入时每次拷贝的块大小
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# file_exists 结果缓存有效期（秒）及最大条目数
+EXISTS_TTL = 1.0
+EXISTS_CACHE_MAX_SIZE = 4096
+
+# 当前平台是否支持相对目录 fd 打开文件（openat）
+_SUPPORTS_DIR_FD = os.open in os.supports_dir_fd
+_DIR_OPEN_FLAGS = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0) | getattr(os, "O_CLOEXEC", 0)
+# 最多缓存的目录 fd 数量，超出后的子目录按完整路径打开
+DIR_FD_CACHE_MAX_SIZE = 16
 
 
 class LocalStorage(StorageInterface):
@@ -22,10 +43,22 @@ class LocalStorage(StorageInterface):
         """
         self.base_dir = base_dir or settings.UPLOAD_DIR
         self._ensure_directory_exists(self.base_dir)
+        # 专用 I/O 线程池：并发上传的写入在这里并行执行，不占用默认线程池
+        self._io_executor = ThreadPoolExecutor(
+            max_workers=settings.STORAGE_IO_WORKERS,
+            thread_name_prefix="storage-io"
+        )
+        # 子目录 -> 已打开的目录 fd（进程内只打开一次，之后用 openat 创建文件；close 时关闭）
+        self._dir_fds: Dict[str, int] = {}
+        # 目录被删除 / 替换后作废的目录 fd（其他线程可能仍在使用，close 时统一关闭）
+        self._stale_dir_fds: List[int] = []
+        self._dir_fds_lock = threading.Lock()
+        # 完整路径 -> (是否存在, 过期时间)；本实例的写入/删除会直接更新
+        self._exists_cache: Dict[str, Tuple[bool, float]] = {}
     
     def _ensure_directory_exists(self, directory: str):
         """确保目录存在"""
-        Path(directory).mkdir(parents=True, exist_ok=True)
+        ensure_dir(directory)
     
     def _get_full_path(self, file_path: str) -> str:
         """获取完整路径"""
@@ -48,22 +81,190 @@ class LocalStorage(StorageInterface):
         Returns:
             str: 相对文件路径
         """
-        # 构建保存路径
-        if subdirectory:
-            save_dir = os.path.join(self.base_dir, subdirectory)
-            self._ensure_directory_exists(save_dir)
-            relative_path = os.path.join(subdirectory, filename)
-        else:
-            relative_path = filename
+        relative_path = self._build_relative_path(filename, subdirectory)
+        full_path = self._get_full_path(relative_path)
+        opener = self._get_dir_opener(subdirectory)
         
+        # 在存储线程池中一次性写入（open/write/close 只占用一次线程切换）
+        await self._run_io(self._write_bytes, full_path, file_data, opener)
+        self._set_exists(full_path, True)
+        
+        return relative_path
+    
+    async def save_fileobj(
+        self,
+        file_obj: BinaryIO,
+        filename: str,
+        subdirectory: Optional[str] = None
+    ) -> str:
+        """
+        从文件对象流式保存到本地
+        
+        整个拷贝在存储线程池中一次完成，不阻塞事件循环，也不会把文件整体读入内存。
+        
+        Args:
+            file_obj: 可读的二进制文件对象（如 UploadFile.file）
+            filename: 文件名
+            subdirectory: 子目录
+            
+        Returns:
+            str: 相对文件路径
+        """
+        relative_path = self._build_relative_path(filename, subdirectory)
         full_path = self._get_full_path(relative_path)
+        opener = self._get_dir_opener(subdirectory)
         
-        # 异步写入文件
-        async with aiofiles.open(full_path, 'wb') as f:
-            await f.write(file_data)
+        await self._run_io(self._copy_fileobj, file_obj, full_path, opener)
+        self._set_exists(full_path, True)
         
         return relative_path
     
+    async def _run_io(self, func, *args):
+        """在存储专用线程池中执行阻塞 I/O"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_executor, func, *args)
+    
+    def _build_relative_path(self, filename: str, subdirectory: Optional[str]) -> str:
+        """构建相对路径（必要时创建子目录）"""
+        if subdirectory:
+            self._ensure_directory_exists(os.path.join(self.base_dir, subdirectory))
+            return os.path.join(subdirectory, filename)
+        return filename
+    
+    def _get_dir_opener(self, subdirectory: Optional[str]) -> Callable[[str, int], int]:
+        """
+        获取写入子目录文件的 opener
+        
+        目录 fd 在首次使用时打开并缓存，之后每次保存只需一次 openat，
+        内核不必再逐级解析完整路径；平台不支持 dir_fd 时按完整路径打开。
+        目录被外部删除（打开时 ENOENT）后会丢弃缓存、重建目录并重试一次。
+        
+        Args:
+            subdirectory: 子目录
+            
+        Returns:
+            可传给 open(opener=...) 的函数
+        """
+        key = subdirectory or ""
+        
+        def open_in_dir(path: str, flags: int) -> int:
+            dir_fd = self._get_dir_fd(key)
+            if dir_fd is None:
+                return os.open(path, flags, 0o666)
+            return os.open(os.path.basename(path), flags, 0o666, dir_fd=dir_fd)
+        
+        def opener(path: str, flags: int) -> int:
+            try:
+                return open_in_dir(path, flags)
+            except FileNotFoundError:
+                self._reset_dir(key)
+                return open_in_dir(path, flags)
+        
+        return opener
+    
+    def _get_dir_fd(self, key: str) -> Optional[int]:
+        """
+        获取子目录的 fd（首次使用时打开并缓存）
+        
+        Args:
+            key: 子目录（根目录为空字符串）
+            
+        Returns:
+            Optional[int]: 目录 fd；平台不支持、缓存已满或打开失败时返回 None
+        """
+        if not _SUPPORTS_DIR_FD:
+            return None
+        
+        with self._dir_fds_lock:
+            dir_fd = self._dir_fds.get(key)
+            if dir_fd is None:
+                if len(self._dir_fds) >= DIR_FD_CACHE_MAX_SIZE:
+                    return None
+                try:
+                    dir_fd = os.open(os.path.join(self.base_dir, key), _DIR_OPEN_FLAGS)
+                except OSError:
+                    return None
+                self._dir_fds[key] = dir_fd
+            return dir_fd
+    
+    def _reset_dir(self, key: str):
+        """
+        子目录被删除或替换后：作废缓存的目录 fd 和 ensure_dir 记录，并重建目录
+        
+        Args:
+            key: 子目录（根目录为空字符串）
+        """
+        with self._dir_fds_lock:
+            dir_fd = self._dir_fds.pop(key, None)
+            if dir_fd is not None:
+                self._stale_dir_fds.append(dir_fd)
+        
+        directory = os.path.join(self.base_dir, key)
+        forget_dir(directory)
+        self._ensure_directory_exists(directory)
+    
+    @staticmethod
+    def _write_bytes(
+        full_path: str,
+        file_data: bytes,
+        opener: Optional[Callable[[str, int], int]] = None
+    ):
+        """把二进制数据写入目标路径（在工作线程中执行）"""
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0)
+        fd = opener(full_path, flags) if opener else os.open(full_path, flags, 0o666)
+        try:
+            view = memoryview(file_data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+        finally:
+            os.close(fd)
+    
+    @staticmethod
+    def _copy_fileobj(
+        file_obj: BinaryIO,
+        full_path: str,
+        opener: Optional[Callable[[str, int], int]] = None
+    ):
+        """
+        把文件对象内容拷贝到目标路径（在工作线程中执行）
+        
+        - BytesIO 直接写出底层缓冲区视图
+        - 仍在内存中的 SpooledTemporaryFile（未超过阈值的上传）从内存分块拷贝；
+          不调用 fileno()，否则会先把数据转存到临时文件，多一次磁盘写入
+        - 已落盘的上传及其他有真实 fd 的文件对象用 sendfile 在内核中完成拷贝
+        - 其他文件对象回退到分块拷贝
+        """
+        file_obj.seek(0)
+        
+        with open(full_path, 'wb', opener=opener) as f:
+            if isinstance(file_obj, io.BytesIO):
+                with file_obj.getbuffer() as view:
+                    f.write(view)
+                return
+            
+            # SpooledTemporaryFile 数据仍在内存中时 name 为 None
+            if hasattr(file_obj, "rollover") and getattr(file_obj, "name", None) is None:
+                shutil.copyfileobj(file_obj, f, COPY_CHUNK_SIZE)
+                return
+            
+            try:
+                src_fd = file_obj.fileno()
+                size = os.fstat(src_fd).st_size
+                offset = 0
+                while offset < size:
+                    sent = os.sendfile(f.fileno(), src_fd, offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                return
+            except (AttributeError, OSError, io.UnsupportedOperation):
+                # 平台不支持 sendfile 或对象没有真实 fd：回退到分块拷贝
+                file_obj.seek(0)
+                f.seek(0)
+                f.truncate()
+                shutil.copyfileobj(file_obj, f, COPY_CHUNK_SIZE)
+    
     async def get_file(self, file_path: str) -> bytes:
         """
         读取文件
@@ -76,11 +277,13 @@ class LocalStorage(StorageInterface):
         """
         full_path = self._get_full_path(file_path)
         
-        if not os.path.exists(full_path):
+        # 直接打开，不存在时由 open 报错（省去一次额外的 stat）
+        try:
+            async with aiofiles.open(full_path, 'rb') as f:
+                return await f.read()
+        except FileNotFoundError:
+            self._set_exists(full_path, False)
             raise FileNotFoundError(f"文件不存在: {file_path}")
-        
-        async with aiofiles.open(full_path, 'rb') as f:
-            return await f.read()
     
     async def delete_file(self, file_path: str) -> bool:
         """
@@ -95,11 +298,14 @@ class LocalStorage(StorageInterface):
         try:
             full_path = self._get_full_path(file_path)
             
-            if os.path.exists(full_path):
+            try:
                 os.remove(full_path)
-                return True
+            except FileNotFoundError:
+                return False
+            finally:
+                self._exists_cache.pop(full_path, None)
             
-            return False
+            return True
         except Exception as e:
             print(f"删除文件失败: {e}")
             return False
@@ -129,7 +335,43 @@ class LocalStorage(StorageInterface):
             bool: 是否存在
         """
         full_path = self._get_full_path(file_path)
-        return os.path.exists(full_path)
+        
+        cached = self._exists_cache.get(full_path)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        
+        try:
+            os.stat(full_path)
+            exists = True
+        except (FileNotFoundError, NotADirectoryError):
+            exists = False
+        return self._set_exists(full_path, exists)
+    
+    def close(self):
+        """关闭 I/O 线程池和缓存的目录 fd（等待进行中的写入完成）"""
+        self._io_executor.shutdown(wait=True)
+        with self._dir_fds_lock:
+            dir_fds = list(self._dir_fds.values()) + self._stale_dir_fds
+            self._dir_fds = {}
+            self._stale_dir_fds = []
+        for dir_fd in dir_fds:
+            try:
+                os.close(dir_fd)
+            except OSError:
+                pass
+    
+    def _set_exists(self, full_path: str, exists: bool) -> bool:
+        """记录路径是否存在（EXISTS_TTL 秒内有效）"""
+        now = time.monotonic()
+        if len(self._exists_cache) >= EXISTS_CACHE_MAX_SIZE:
+            # 缓存已满：先清理过期条目，仍然满则整体清空
+            self._exists_cache = {
+                path: entry for path, entry in self._exists_cache.items() if entry[1] > now
+            }
+            if len(self._exists_cache) >= EXISTS_CACHE_MAX_SIZE:
+                self._exists_cache.clear()
+        self._exists_cache[full_path] = (exists, now + EXISTS_TTL)
+        return exists
 
 
 # 全局存储实例（单例）
@@ -141,5 +383,7 @@ def get_local_storage() -> LocalStorage:
     global _local_storage_instance
     if _local_storage_instance is None:
         _local_storage_instance = LocalStorage()
+        # 进程退出时释放线程池和目录 fd
+        atexit.register(_local_storage_instance.close)
     return _local_storage_instance
 
@@ -2,8 +2,10 @@
 任务管理服务
 提供任务创建、查询、取消等业务逻辑
 """
-import json
-from typing import Optional, List
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, List
 from datetime import datetime
 
 from app.schemas.task import (
@@ -16,9 +18,87 @@ from app.schemas.task import (
     TaskSummary
 )
 from app.services.tasks.queue import get_task_queue
+from app.utils import json_codec
 from app.utils.id_generator import generate_task_id
 
 
+class ProgressBatch:
+    """
+    批量进度更新器
+    
+    进度更新先写入 Redis pipeline，距上次提交超过 flush_interval 秒或批次结束时
+    再一次性提交，多次更新只需一次网络往返。
+    未到间隔的更新由后台定时器在间隔到期时补交，即使之后长时间没有新的更新
+    （如阻塞在引擎调用中），进度也不会停留在旧值。
+    """
+    
+    def __init__(self, queue, task_id: str, flush_interval: float = 1.0):
+        """
+        初始化批量更新器
+        
+        Args:
+            queue: 任务队列实例
+            task_id: 任务ID
+            flush_interval: 两次提交之间的最长间隔（秒）
+        """
+        self.queue = queue
+        self.task_id = task_id
+        self.flush_interval = flush_interval
+        self._pipe = queue.redis_client.pipeline(transaction=False)
+        self._last_flush = time.monotonic()
+        # pipeline 不是线程安全的，定时器线程与调用方线程共用时需加锁
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+    
+    def update(self, progress: int, current_step: Optional[str] = None):
+        """
+        记录一次进度更新
+        
+        Args:
+            progress: 进度百分比（0-100）
+            current_step: 当前步骤描述
+        """
+        with self._lock:
+            self.queue.update_task_status(
+                task_id=self.task_id,
+                status="processing",
+                progress=progress,
+                current_step=current_step,
+                pipe=self._pipe
+            )
+            remaining = self.flush_interval - (time.monotonic() - self._last_flush)
+            if remaining > 0:
+                # 未到提交间隔：安排一次补交（已有定时器时沿用）
+                if self._timer is None:
+                    self._timer = threading.Timer(remaining, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+                return
+        self.flush()
+    
+    def flush(self) -> bool:
+        """
+        提交已缓冲的更新
+        
+        Returns:
+            bool: 是否成功
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._last_flush = time.monotonic()
+            if not len(self._pipe):
+                return True
+            try:
+                self._pipe.execute()
+                return True
+            except Exception as e:
+                print(f"提交任务进度失败: {self.task_id}, 错误: {e}")
+                self._pipe.reset()
+                return False
+
+
 class TaskService:
     """任务管理服务类"""
     
@@ -186,6 +266,42 @@ class TaskService:
             current_step=current_step
         )
     
+    def begin_task(self, task_id: str, initial_step: Optional[str] = None) -> Optional[dict]:
+        """
+        开始处理任务：更新为处理中并返回任务数据（合并为一次 Redis 往返）
+        
+        Args:
+            task_id: 任务ID
+            initial_step: 初始步骤描述
+            
+        Returns:
+            Optional[dict]: 任务数据，不存在返回 None
+        """
+        return self.queue.begin_task(task_id, current_step=initial_step)
+    
+    @contextmanager
+    def progress_batch(self, task_id: str, flush_interval: float = 1.0) -> Iterator[ProgressBatch]:
+        """
+        批量更新任务进度（退出时提交剩余更新）
+        
+        用法：
+            with task_service.progress_batch(task_id) as progress:
+                progress.update(30, "正在检测人脸...")
+                progress.update(60, "正在进行头部替换...")
+        
+        Args:
+            task_id: 任务ID
+            flush_interval: 两次提交之间的最长间隔（秒）
+            
+        Returns:
+            Iterator[ProgressBatch]: 批量更新器
+        """
+        batch = ProgressBatch(self.queue, task_id, flush_interval)
+        try:
+            yield batch
+        finally:
+            batch.flush()
+    
     def complete_task(
         self, 
         task_id: str, 
@@ -264,8 +380,7 @@ class TaskService:
             # Parse task input data
             input_data = task_data.get("data", {})
             if isinstance(input_data, str):
-                import json
-                input_data = json.loads(input_data)
+                input_data = json_codec.loads(input_data)
             
             user_id = input_data.get("user_id")
             credits_consumed = input_data.get("credits_consumed")
@@ -276,7 +391,7 @@ class TaskService:
             
             # Refund credits
             from app.services.billing import billing_service
-            success = billing_service.add_credits(user_id, credits_consumed)
+            success, _ = billing_service.add_credits(user_id, credits_consumed)
             
             if success:
                 print(f"[Refund] ✓ Refunded {credits_consumed} credits to user {user_id} for failed task {task_id}")
@@ -317,14 +432,14 @@ class TaskService:
         # 解析任务输入数据
         input_data = task_data.get("data", {})
         if isinstance(input_data, str):
-            input_data = json.loads(input_data)
+            input_data = json_codec.loads(input_data)
         
         # 解析结果数据
         result = None
         if "result" in task_data:
             result_data = task_data["result"]
             if isinstance(result_data, str):
-                result_data = json.loads(result_data)
+                result_data = json_codec.loads(result_data)
             result = TaskResult(**result_data)
         
         # 解析错误信息
@@ -332,7 +447,7 @@ class TaskService:
         if "error" in task_data:
             error_data = task_data["error"]
             if isinstance(error_data, str):
-                error_data = json.loads(error_data)
+                error_data = json_codec.loads(error_data)
             error = TaskError(**error_data)
         
         # 构建 TaskInfo
@@ -2,13 +2,13 @@
 Redis 任务队列管理
 负责任务的入队、出队操作
 """
-import json
 import redis
 from typing import Optional, Dict, Any
 from datetime import datetime
 
 from app.core.config import settings
-from app.utils.redis_client import get_redis_client
+from app.utils import json_codec
+from app.utils.redis_client import get_blocking_redis_client, get_redis_client, is_redis_ping_ok
 
 
 class TaskQueue:
@@ -19,10 +19,21 @@ class TaskQueue:
     TASK_KEY_PREFIX = "formy:task:data:"     # 任务数据（Hash）
     PROCESSING_SET = "formy:task:processing" # 处理中任务集合（Set）
     
+    # 开始处理任务：任务存在时才写入状态并返回任务数据，避免为已删除的任务留下残缺 Hash
+    # KEYS[1]: 任务 Hash；ARGV: 交替的字段名/字段值
+    BEGIN_TASK_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {}
+end
+redis.call('HSET', KEYS[1], unpack(ARGV))
+return redis.call('HGETALL', KEYS[1])
+"""
+    
     def __init__(self):
         """初始化 Redis 连接"""
         # 使用统一的 Redis 客户端（基于 REDIS_URL）
         self.redis_client = get_redis_client()
+        self._begin_task_script = self.redis_client.register_script(self.BEGIN_TASK_SCRIPT)
     
     def push_task(self, task_id: str, task_data: Dict[str, Any]) -> bool:
         """
@@ -43,7 +54,7 @@ class TaskQueue:
                 mapping={
                     "task_id": task_id,
                     "status": "pending",
-                    "data": json.dumps(task_data, ensure_ascii=False),
+                    "data": json_codec.dumps(task_data),
                     "created_at": datetime.now().isoformat(),
                     "updated_at": datetime.now().isoformat()
                 }
@@ -57,29 +68,58 @@ class TaskQueue:
             print(f"推送任务失败: {e}")
             return False
     
-    def pop_task(self, timeout: int = 5) -> Optional[str]:
+    def pop_task(self, timeout: Optional[int] = None) -> Optional[str]:
         """
         从队列中弹出任务（阻塞式）
         
+        任务入队后 BLPOP 立即返回，调用方无需额外轮询或 sleep。
+        
         Args:
-            timeout: 阻塞超时时间（秒）
+            timeout: 阻塞超时时间（秒），默认使用 QUEUE_POP_TIMEOUT
             
         Returns:
             Optional[str]: 任务ID，如果超时返回 None
+            
+        Raises:
+            redis.ConnectionError / redis.TimeoutError: Redis 连接异常，由调用方退避重试
         """
+        if timeout is None:
+            timeout = settings.QUEUE_POP_TIMEOUT
         try:
-            # 从左侧弹出（FIFO）
-            result = self.redis_client.blpop(self.QUEUE_KEY, timeout=timeout)
+            # 从左侧弹出（FIFO）；BLPOP 使用读超时更长的专用客户端
+            result = get_blocking_redis_client().blpop(self.QUEUE_KEY, timeout=timeout)
             if result:
                 _, task_id = result
                 # 标记为处理中
                 self.redis_client.sadd(self.PROCESSING_SET, task_id)
                 return task_id
             return None
+        except (redis.ConnectionError, redis.TimeoutError):
+            raise
         except Exception as e:
             print(f"弹出任务失败: {e}")
             return None
     
+    def requeue_task(self, task_id: str) -> bool:
+        """
+        把已弹出但未处理的任务放回队首（Worker 关闭时归还预取的任务）
+        
+        Args:
+            task_id: 任务ID
+            
+        Returns:
+            bool: 是否成功
+        """
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.lpush(self.QUEUE_KEY, task_id)
+            pipe.srem(self.PROCESSING_SET, task_id)
+            pipe.execute()
+            return True
+        except Exception as e:
+            print(f"归还任务失败: {e}")
+            return False
+    
     def get_task_data(self, task_id: str) -> Optional[Dict[str, Any]]:
         """
         获取任务数据
@@ -99,13 +139,56 @@ class TaskQueue:
             
             # 解析 JSON 数据
             if "data" in data:
-                data["data"] = json.loads(data["data"])
+                data["data"] = json_codec.loads(data["data"])
             
             return data
         except Exception as e:
             print(f"获取任务数据失败: {e}")
             return None
     
+    def begin_task(self, task_id: str, current_step: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        开始处理任务：标记为处理中并读取任务数据（一次 Lua 脚本往返）
+        
+        任务不存在（如已被删除）时不写入任何字段。
+        
+        Args:
+            task_id: 任务ID
+            current_step: 当前步骤描述
+            
+        Returns:
+            Optional[Dict]: 任务数据（与 get_task_data 格式相同），不存在返回 None
+        """
+        try:
+            update_data = {
+                "status": "processing",
+                "progress": "0",
+                "updated_at": datetime.now().isoformat()
+            }
+            if current_step:
+                update_data["current_step"] = current_step
+            
+            args = [item for pair in update_data.items() for item in pair]
+            values = self._begin_task_script(
+                keys=[f"{self.TASK_KEY_PREFIX}{task_id}"],
+                args=args
+            )
+            
+            if not values:
+                return None
+            
+            # HGETALL 返回交替的字段名/字段值列表
+            data = dict(zip(values[::2], values[1::2]))
+            
+            # 解析 JSON 数据
+            if "data" in data:
+                data["data"] = json_codec.loads(data["data"])
+            
+            return data
+        except Exception as e:
+            print(f"开始处理任务失败: {e}")
+            return None
+    
     def update_task_status(
         self, 
         task_id: str, 
@@ -113,7 +196,8 @@ class TaskQueue:
         progress: int = 0,
         current_step: Optional[str] = None,
         result: Optional[Dict[str, Any]] = None,
-        error: Optional[Dict[str, Any]] = None
+        error: Optional[Dict[str, Any]] = None,
+        pipe: Optional[Any] = None
     ) -> bool:
         """
         更新任务状态
@@ -125,11 +209,13 @@ class TaskQueue:
             current_step: 当前步骤描述
             result: 结果数据（完成时）
             error: 错误信息（失败时）
+            pipe: Redis pipeline（可选）。传入时命令只写入 pipeline，由调用方统一 execute
             
         Returns:
             bool: 是否成功
         """
         try:
+            client = pipe if pipe is not None else self.redis_client
             task_key = f"{self.TASK_KEY_PREFIX}{task_id}"
             
             # 构建更新字段
@@ -143,10 +229,10 @@ class TaskQueue:
                 update_data["current_step"] = current_step
             
             if result:
-                update_data["result"] = json.dumps(result, ensure_ascii=False)
+                update_data["result"] = json_codec.dumps(result)
             
             if error:
-                update_data["error"] = json.dumps(error, ensure_ascii=False)
+                update_data["error"] = json_codec.dumps(error)
             
             # 记录完成/失败时间
             if status == "done":
@@ -155,11 +241,11 @@ class TaskQueue:
                 update_data["failed_at"] = datetime.now().isoformat()
             
             # 更新 Hash
-            self.redis_client.hset(task_key, mapping=update_data)
+            client.hset(task_key, mapping=update_data)
             
             # 如果任务完成/失败/取消，从处理中集合移除
             if status in ["done", "failed", "cancelled"]:
-                self.redis_client.srem(self.PROCESSING_SET, task_id)
+                client.srem(self.PROCESSING_SET, task_id)
             
             return True
         except Exception as e:
@@ -261,8 +347,19 @@ class TaskQueue:
             print(f"获取任务列表失败: {e}")
             return []
     
-    def health_check(self) -> bool:
-        """健康检查"""
+    def health_check(self, startup: bool = False) -> bool:
+        """
+        健康检查
+        
+        Args:
+            startup: 是否为启动阶段检查。启动时共享客户端刚 PING 成功，不再重复 PING；
+                其他情况总是实际 PING 一次
+            
+        Returns:
+            bool: Redis 是否可用
+        """
+        if startup and is_redis_ping_ok():
+            return True
         try:
             return self.redis_client.ping()
         except Exception:
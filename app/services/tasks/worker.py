@@ -5,11 +5,14 @@
 import time
 import signal
 import sys
+import threading
 from typing import Optional
 from pathlib import Path
 
+from app.core.config import settings
 from app.services.tasks.queue import get_task_queue
 from app.services.tasks.manager import get_task_service
+from app.utils.redis_client import get_worker_concurrency
 from app.schemas.task import EditMode
 from app.services.image.image_assets import (
     resolve_uploaded_file,
@@ -39,27 +42,44 @@ class TaskWorker:
         self.is_running = False
     
     def start(self):
-        """启动 Worker 循环"""
-        print("[Worker] 任务 Worker 已启动，等待任务...")
+        """启动 Worker：启动多个消费线程并等待其结束"""
+        concurrency = get_worker_concurrency()
+        if concurrency < settings.WORKER_CONCURRENCY:
+            print(
+                f"[Worker] ⚠️  WORKER_CONCURRENCY={settings.WORKER_CONCURRENCY} 超出 Redis 连接池容量"
+                f"（REDIS_POOL_SIZE={settings.REDIS_POOL_SIZE}），已限制为 {concurrency}"
+            )
+        print(f"[Worker] 任务 Worker 已启动（{concurrency} 个消费线程），等待任务...")
         self.is_running = True
         
+        consumers = [
+            threading.Thread(target=self._consume_loop, name=f"task-consumer-{i}", daemon=True)
+            for i in range(concurrency)
+        ]
+        for consumer in consumers:
+            consumer.start()
+        
+        # 主线程定期 join，保证能及时响应关闭信号
+        while any(consumer.is_alive() for consumer in consumers):
+            for consumer in consumers:
+                consumer.join(timeout=1)
+        
+        print("[Worker] 任务 Worker 已停止")
+    
+    def _consume_loop(self):
+        """消费线程循环：阻塞获取任务并处理，直到 Worker 停止"""
         while self.is_running:
             try:
-                # 从队列中获取任务（阻塞式，超时 5 秒）
-                task_id = self.queue.pop_task(timeout=5)
+                # 从队列中获取任务（阻塞式，有任务入队时立即返回）
+                task_id = self.queue.pop_task()
                 
                 if task_id:
-                    print(f"[Worker] 获取到任务: {task_id}")
+                    print(f"[Worker] [{threading.current_thread().name}] 获取到任务: {task_id}")
                     self._process_task(task_id)
-                else:
-                    # 超时未获取到任务，继续循环
-                    continue
                     
             except Exception as e:
                 print(f"[Worker] Worker 循环出错: {e}")
                 time.sleep(1)  # 出错后等待 1 秒再继续
-        
-        print("[Worker] 任务 Worker 已停止")
     
     def _process_task(self, task_id: str):
         """
@@ -69,8 +89,8 @@ class TaskWorker:
             task_id: 任务ID
         """
         try:
-            # 1. 获取任务数据
-            task_data = self.queue.get_task_data(task_id)
+            # 1. 更新状态为处理中，同时获取任务数据（同一次 Redis 往返）
+            task_data = self.task_service.begin_task(task_id, "任务已开始处理")
             
             if not task_data:
                 print(f"[Worker] 任务数据不存在: {task_id}")
@@ -84,14 +104,7 @@ class TaskWorker:
             
             print(f"[Worker] 开始处理任务 {task_id} - 模式: {mode}")
             
-            # 3. 更新状态为处理中
-            self.task_service.update_task_progress(
-                task_id=task_id,
-                progress=0,
-                current_step="任务已开始处理"
-            )
-            
-            # 4. 根据模式分发到对应的 Pipeline
+            # 3. 根据模式分发到对应的 Pipeline
             result = self._dispatch_to_pipeline(
                 task_id=task_id,
                 mode=mode,
@@ -99,7 +112,7 @@ class TaskWorker:
                 config=config
             )
             
-            # 5. 标记任务完成
+            # 4. 标记任务完成
             if result:
                 self.task_service.complete_task(task_id, result)
                 print(f"[Worker] 任务完成: {task_id}")
@@ -162,6 +175,12 @@ class TaskWorker:
             print(f"[Worker] Pipeline 处理失败: {e}")
             return None
     
+    @staticmethod
+    def _mock_delay():
+        """骨架流程的模拟耗时（PIPELINE_MOCK_DELAY 为 0 时不等待）"""
+        if settings.PIPELINE_MOCK_DELAY:
+            time.sleep(settings.PIPELINE_MOCK_DELAY)
+    
     def _process_head_swap(
         self, 
         task_id: str, 
@@ -182,15 +201,16 @@ class TaskWorker:
         # TODO: 调用 HeadSwapPipeline
         print(f"[Worker] 执行换头处理...")
         
-        # 更新进度
-        self.task_service.update_task_progress(task_id, 30, "正在检测人脸...")
-        time.sleep(1)  # 模拟处理
-        
-        self.task_service.update_task_progress(task_id, 60, "正在进行头部替换...")
-        time.sleep(1)
-        
-        self.task_service.update_task_progress(task_id, 90, "正在进行图像融合...")
-        time.sleep(1)
+        # 更新进度（批量提交到 Redis）
+        with self.task_service.progress_batch(task_id) as progress:
+            progress.update(30, "正在检测人脸...")
+            self._mock_delay()
+            
+            progress.update(60, "正在进行头部替换...")
+            self._mock_delay()
+            
+            progress.update(90, "正在进行图像融合...")
+            self._mock_delay()
         
         # 返回模拟结果
         return {
@@ -223,14 +243,15 @@ class TaskWorker:
         # TODO: 调用 BackgroundPipeline
         print(f"[Worker] 执行换背景处理...")
         
-        self.task_service.update_task_progress(task_id, 25, "正在进行人像抠图...")
-        time.sleep(1)
-        
-        self.task_service.update_task_progress(task_id, 50, "正在替换背景...")
-        time.sleep(1)
-        
-        self.task_service.update_task_progress(task_id, 80, "正在进行边缘融合...")
-        time.sleep(1)
+        with self.task_service.progress_batch(task_id) as progress:
+            progress.update(25, "正在进行人像抠图...")
+            self._mock_delay()
+            
+            progress.update(50, "正在替换背景...")
+            self._mock_delay()
+            
+            progress.update(80, "正在进行边缘融合...")
+            self._mock_delay()
         
         return {
             "output_image": f"/results/{task_id}_output.jpg",
@@ -314,7 +335,7 @@ def run_worker():
     
     # 检查 Redis 连接
     queue = get_task_queue()
-    if not queue.health_check():
+    if not queue.health_check(startup=True):
         print("[错误] 无法连接到 Redis，请检查配置")
         sys.exit(1)
     
@@ -0,0 +1,105 @@
+"""
+文件系统操作工具
+"""
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import Set, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+# Linux 的 reflink ioctl（Python 3.12 起 fcntl 才提供该常量）
+_FICLONE = (
+    getattr(fcntl, "FICLONE", 0x40049409)
+    if fcntl is not None and sys.platform.startswith("linux")
+    else None
+)
+
+# posix_fadvise 仅 Unix 提供
+_FADV_SEQUENTIAL = getattr(os, "POSIX_FADV_SEQUENTIAL", None)
+
+# 本进程中已确认存在的目录
+_ensured_dirs: Set[str] = set()
+
+
+def ensure_dir(path: Union[str, Path]) -> None:
+    """
+    确保目录存在（每个目录在进程内只执行一次 mkdir）
+    
+    Args:
+        path: 目录路径
+    """
+    key = os.fspath(path)
+    if key in _ensured_dirs:
+        return
+    Path(key).mkdir(parents=True, exist_ok=True)
+    _ensured_dirs.add(key)
+
+
+def forget_dir(path: Union[str, Path]) -> None:
+    """
+    清除 ensure_dir 对某个目录的记录（目录被外部删除后，下次 ensure_dir 会重新创建）
+    
+    Args:
+        path: 目录路径
+    """
+    _ensured_dirs.discard(os.fspath(path))
+
+
+def copy_file(src: Union[str, Path], dst: Union[str, Path]) -> None:
+    """
+    复制文件内容，尽量在内核中完成
+    
+    依次尝试：
+    1. FICLONE reflink（btrfs / XFS 等写时复制文件系统，O(1) 完成）
+    2. os.copy_file_range（Linux 内核内拷贝）
+    3. shutil.copyfile（Linux 上内部使用 sendfile）
+    
+    拷贝前对源文件声明顺序读取，让内核加大预读。
+    
+    Args:
+        src: 源文件路径
+        dst: 目标文件路径
+    """
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        src_fd = fsrc.fileno()
+        dst_fd = fdst.fileno()
+        _advise_sequential(src_fd)
+        
+        if _FICLONE is not None:
+            try:
+                fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+                return
+            except OSError:
+                pass
+        
+        if hasattr(os, "copy_file_range"):
+            try:
+                size = os.fstat(src_fd).st_size
+                copied = 0
+                while copied < size:
+                    n = os.copy_file_range(src_fd, dst_fd, size - copied)
+                    if n == 0:
+                        break
+                    copied += n
+                if copied == size:
+                    return
+            except OSError:
+                pass
+    
+    # 前两种方式不可用或中途失败：重新完整复制（目标文件会被截断重写）
+    shutil.copyfile(src, dst)
+
+
+def _advise_sequential(fd: int) -> None:
+    """提示内核该文件将被顺序完整读取（不支持时忽略）"""
+    if _FADV_SEQUENTIAL is None:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, _FADV_SEQUENTIAL)
+    except OSError:
+        pass
@@ -8,19 +8,79 @@ from pathlib import Path
 from typing import Optional, Tuple, Union
 from PIL import Image
 
+try:
+    import cv2  # opencv-python，可选依赖
+    import numpy as np
+except ImportError:  # pragma: no cover - 未安装时使用 Pillow 缩放
+    cv2 = None
+    np = None
 
-def load_image(image_path: str) -> Image.Image:
+from app.core.config import settings
+from app.utils.file_ops import ensure_dir
+
+# 缩放使用的重采样滤镜
+_LANCZOS = Image.Resampling.LANCZOS
+
+# cv2 可以直接处理的颜色模式（uint8 单通道 / 三通道）
+_CV2_RESIZE_MODES = frozenset({"L", "RGB"})
+
+
+def resize_lanczos(image: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """
+    LANCZOS 缩放
+    
+    开启 USE_OPENCV_RESIZE 且安装了 opencv-python 时，L / RGB 图片使用 cv2.resize（SIMD 加速），
+    否则使用 Pillow。
+    
+    Args:
+        image: PIL Image 对象
+        size: 目标尺寸 (宽, 高)
+        
+    Returns:
+        Image.Image: 缩放后的图片
+    """
+    if settings.USE_OPENCV_RESIZE and cv2 is not None and image.mode in _CV2_RESIZE_MODES:
+        resized = cv2.resize(np.asarray(image), size, interpolation=cv2.INTER_LANCZOS4)
+        return Image.fromarray(resized, mode=image.mode)
+    return image.resize(size, _LANCZOS)
+
+
+def _flatten_alpha_to_rgb(image: Image.Image, bg: Tuple[int, int, int] = (255, 255, 255)) -> Image.Image:
+    """
+    把带透明通道（或调色板）的图片合成到纯色背景上，返回 RGB 图片
+    
+    Args:
+        image: RGBA / LA / P 模式的 PIL Image 对象
+        bg: 背景色
+        
+    Returns:
+        Image.Image: RGB 图片
+    """
+    background = Image.new("RGB", image.size, bg)
+    if image.mode == "P":
+        image = image.convert("RGBA")
+    # getchannel 只取出 alpha 一个通道，不必像 split() 那样拆出所有通道
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def load_image(image_path: str, target_size: Optional[Tuple[int, int]] = None) -> Image.Image:
     """
     加载图片
     
     Args:
         image_path: 图片路径
+        target_size: 期望的最小尺寸（可选）。JPEG 会在解码时直接缩小到不小于该尺寸，
+            其他格式忽略此参数
         
     Returns:
         Image.Image: PIL Image 对象
     """
     try:
         image = Image.open(image_path)
+        if target_size and settings.PIL_FAST_DRAFT:
+            # 仅 JPEG 支持，其他格式为空操作
+            image.draft(image.mode, target_size)
         return image
     except Exception as e:
         raise ValueError(f"加载图片失败: {image_path}, 错误: {e}")
@@ -38,17 +98,12 @@ def save_image(image: Image.Image, output_path: str, format: str = "JPEG", quali
     """
     try:
         # 确保输出目录存在
-        output_dir = Path(output_path).parent
-        output_dir.mkdir(parents=True, exist_ok=True)
+        ensure_dir(Path(output_path).parent)
         
         # 如果是 JPEG 格式且有 alpha 通道，转换为 RGB
         if format.upper() in ["JPEG", "JPG"] and image.mode in ["RGBA", "LA", "P"]:
-            # 创建白色背景
-            background = Image.new("RGB", image.size, (255, 255, 255))
-            if image.mode == "P":
-                image = image.convert("RGBA")
-            background.paste(image, mask=image.split()[-1] if image.mode in ["RGBA", "LA"] else None)
-            image = background
+            # 合成到白色背景
+            image = _flatten_alpha_to_rgb(image)
         
         # 保存图片
         image.save(output_path, format=format, quality=quality)
@@ -79,11 +134,7 @@ def image_to_base64(image: Union[Image.Image, str], format: str = "JPEG", qualit
         
         # 处理 JPEG 格式的 alpha 通道
         if format.upper() in ["JPEG", "JPG"] and image.mode in ["RGBA", "LA", "P"]:
-            background = Image.new("RGB", image.size, (255, 255, 255))
-            if image.mode == "P":
-                image = image.convert("RGBA")
-            background.paste(image, mask=image.split()[-1] if image.mode in ["RGBA", "LA"] else None)
-            image = background
+            image = _flatten_alpha_to_rgb(image)
         
         image.save(buffer, format=format, quality=quality)
         image_bytes = buffer.getvalue()
@@ -163,31 +214,37 @@ def resize_image(
         new_width = max_width or width
         new_height = max_height or height
     
-    resized = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    resized = resize_lanczos(image, (new_width, new_height))
     
     return resized
 
 
-def create_thumbnail(image: Union[Image.Image, str], size: Tuple[int, int] = (256, 256)) -> Image.Image:
+def create_thumbnail(
+    image: Union[Image.Image, str],
+    size: Tuple[int, int] = (256, 256),
+    copy: bool = True
+) -> Image.Image:
     """
     创建缩略图
     
     Args:
         image: PIL Image 对象或图片路径
         size: 缩略图尺寸
+        copy: 传入 Image 对象时是否先复制（False 时直接在原图上缩放）
         
     Returns:
         Image.Image: 缩略图
     """
-    # 如果是路径，先加载
     if isinstance(image, str):
-        image = load_image(image)
+        # 路径：新打开的图片归本函数所有，JPEG 直接按缩略图尺寸解码，无需复制
+        image = load_image(image, target_size=size)
+    elif copy:
+        image = image.copy()
     
-    # 创建缩略图（保持宽高比）
-    image_copy = image.copy()
-    image_copy.thumbnail(size, Image.Resampling.LANCZOS)
+    # 创建缩略图（保持宽高比，原地缩放）
+    image.thumbnail(size, _LANCZOS)
     
-    return image_copy
+    return image
 
 
 def get_image_info(image: Union[Image.Image, str]) -> dict:
@@ -209,7 +266,8 @@ def get_image_info(image: Union[Image.Image, str]) -> dict:
         "height": image.height,
         "mode": image.mode,
         "format": image.format or "Unknown",
-        "size_bytes": len(image.tobytes()) if image.mode else 0
+        # 由尺寸和通道数推算像素数据大小，不触发解码和整块像素拷贝
+        "size_bytes": image.width * image.height * len(image.getbands()) if image.mode else 0
     }
 
 
@@ -231,11 +289,7 @@ def convert_format(image: Union[Image.Image, str], target_format: str) -> Image.
     # 处理不同格式的颜色模式
     if target_format.upper() in ["JPEG", "JPG"]:
         if image.mode in ["RGBA", "LA", "P"]:
-            background = Image.new("RGB", image.size, (255, 255, 255))
-            if image.mode == "P":
-                image = image.convert("RGBA")
-            background.paste(image, mask=image.split()[-1] if image.mode in ["RGBA", "LA"] else None)
-            image = background
+            image = _flatten_alpha_to_rgb(image)
         elif image.mode not in ["RGB", "L"]:
             image = image.convert("RGB")
     elif target_format.upper() == "PNG":
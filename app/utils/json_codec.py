@@ -0,0 +1,79 @@
+"""
+JSON 编解码工具
+安装了 orjson 时使用 orjson（解析更快、分配更少），否则回退到标准库 json
+"""
+import json
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 未安装 orjson 时使用标准库
+    orjson = None
+
+
+if orjson is not None:
+    _DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS
+    
+    def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        """
+        解析 JSON
+        
+        Args:
+            data: JSON 字节或字符串
+        
+        Returns:
+            Any: 解析结果
+        """
+        return orjson.loads(data)
+    
+    def dumps(obj: Any) -> str:
+        """
+        序列化为 JSON 字符串（UTF-8 原样输出，不转义非 ASCII 字符）
+        
+        Args:
+            obj: 待序列化对象
+        
+        Returns:
+            str: JSON 字符串
+        """
+        return orjson.dumps(obj, option=_DUMPS_OPTIONS).decode()
+else:
+    def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        """
+        解析 JSON
+        
+        Args:
+            data: JSON 字节或字符串
+        
+        Returns:
+            Any: 解析结果
+        """
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+    
+    def dumps(obj: Any) -> str:
+        """
+        序列化为 JSON 字符串（UTF-8 原样输出，不转义非 ASCII 字符）
+        
+        Args:
+            obj: 待序列化对象
+        
+        Returns:
+            str: JSON 字符串
+        """
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_file(path: Union[str, Path]) -> Any:
+    """
+    读取并解析 JSON 文件
+    
+    Args:
+        path: 文件路径
+    
+    Returns:
+        Any: 解析结果
+    """
+    return loads(Path(path).read_bytes())
@@ -2,15 +2,79 @@
 Redis 客户端工具
 统一管理 Redis 连接，使用 REDIS_URL 配置
 """
+import socket
+import threading
+from typing import Dict, Optional
+
 import redis
+from redis.utils import HIREDIS_AVAILABLE
 from app.core.config import settings
 
+# 进程内共享的 Redis 客户端（首次连接成功后缓存）
+_CLIENT: Optional[redis.Redis] = None
+_LOCK = threading.Lock()
+# 共享客户端创建时的 PING 是否成功
+_PING_OK = False
+# BLPOP 等阻塞命令专用的客户端（独立连接池，读超时更长）
+_BLOCKING_CLIENT: Optional[redis.Redis] = None
+
+# 普通命令的读超时（秒）：Redis 卡住时计费 / API 请求尽快失败，而不是长时间挂起
+SOCKET_TIMEOUT = 5
+
+# 连接池已满时等待空闲连接的最长时间（秒）
+POOL_WAIT_TIMEOUT = 5
+
+# 共享连接池中留给消费线程以外命令的连接数
+POOL_RESERVED_CONNECTIONS = 4
+
+# TCP keepalive：空闲 60 秒后开始探测，每 10 秒一次，连续 3 次无响应即断开
+# （部分平台没有这些常量，缺失的项直接跳过）
+_KEEPALIVE_OPTIONS: Dict[int, int] = {
+    getattr(socket, name): value
+    for name, value in (("TCP_KEEPIDLE", 60), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3))
+    if hasattr(socket, name)
+}
+
 
 def get_redis_client() -> redis.Redis:
     """
-    获取 Redis 客户端实例
+    获取 Redis 客户端实例（单例）
+    
+    统一使用 REDIS_URL 配置，不再使用 localhost。
+    首次调用时建立连接并 PING 校验，之后直接返回同一个客户端。
+    
+    注意：这里固定返回同步客户端，Worker 的处理流程也是同步的。
+    若将来改为异步，请同时使用 uvloop.install() + redis.asyncio.Redis，
+    不要在默认 asyncio 事件循环上使用 redis.asyncio（吞吐会明显下降）。
+    
+    Returns:
+        redis.Redis: Redis 客户端实例
+        
+    Raises:
+        ValueError: 如果 REDIS_URL 未配置
+    """
+    global _CLIENT, _PING_OK
+    if _CLIENT is not None:
+        return _CLIENT
+    
+    with _LOCK:
+        if _CLIENT is None:
+            # _create_redis_client 在 PING 失败时抛出异常，能走到赋值说明连接已验证
+            _CLIENT = _create_redis_client(
+                max_connections=settings.REDIS_POOL_SIZE,
+                socket_timeout=SOCKET_TIMEOUT
+            )
+            _PING_OK = True
+    return _CLIENT
+
+
+def get_blocking_redis_client() -> redis.Redis:
+    """
+    获取阻塞命令（BLPOP）专用的 Redis 客户端（单例）
     
-    统一使用 REDIS_URL 配置，不再使用 localhost
+    BLPOP 最长会阻塞 QUEUE_POP_TIMEOUT 秒，读超时必须比它更长；
+    这类命令使用独立的连接池，共享客户端保持较短的读超时。
+    只在 Worker 消费任务时才会创建。
     
     Returns:
         redis.Redis: Redis 客户端实例
@@ -18,6 +82,35 @@ def get_redis_client() -> redis.Redis:
     Raises:
         ValueError: 如果 REDIS_URL 未配置
     """
+    global _BLOCKING_CLIENT
+    if _BLOCKING_CLIENT is not None:
+        return _BLOCKING_CLIENT
+    
+    with _LOCK:
+        if _BLOCKING_CLIENT is None:
+            _BLOCKING_CLIENT = _create_redis_client(
+                max_connections=_get_pool_size(),
+                socket_timeout=max(SOCKET_TIMEOUT, settings.QUEUE_POP_TIMEOUT + 5)
+            )
+    return _BLOCKING_CLIENT
+
+
+def is_redis_ping_ok() -> bool:
+    """共享客户端是否已在创建时 PING 成功（用于省去启动阶段重复的 PING）"""
+    return _PING_OK
+
+
+def _create_redis_client(max_connections: int, socket_timeout: float) -> redis.Redis:
+    """
+    创建 Redis 客户端并测试连接
+    
+    Args:
+        max_connections: 连接池最大连接数
+        socket_timeout: 读超时（秒）
+        
+    Returns:
+        redis.Redis: Redis 客户端实例
+    """
     # 使用配置对象的 get_redis_url 方法（优先 REDIS_URL，否则从分散配置构建）
     redis_url = settings.get_redis_url
     
@@ -27,29 +120,106 @@ def get_redis_client() -> redis.Redis:
             "格式: redis://[:password@]host[:port][/db]"
         )
     
-    # 打印 Redis URL（隐藏密码）以便调试
-    url_display = redis_url[:30] + "..." if len(redis_url) > 30 else redis_url
-    if "@" in redis_url:
-        # 隐藏密码部分
-        parts = redis_url.split("@")
-        url_display = f"{parts[0].split('://')[0]}://****@{parts[1][:30]}..."
-    print(f"[Worker Redis] 🔗 Connecting to: {url_display}")
+    # 打印 Redis URL（隐藏密码）以便调试；只在首次建立连接时执行一次
+    print(f"[Worker Redis] 🔗 Connecting to: {_sanitize_redis_url(redis_url)}")
     
-    # 使用 REDIS_URL 创建连接
-    redis_client = redis.from_url(
+    # TCP 连接开启 keepalive，尽快发现被代理 / NAT 静默断开的连接（unix socket 不支持这些参数）
+    tcp_options = {}
+    if not redis_url.startswith("unix://"):
+        tcp_options = {
+            "socket_keepalive": True,
+            "socket_keepalive_options": _KEEPALIVE_OPTIONS,
+        }
+    
+    # 使用 REDIS_URL 创建有上限的阻塞连接池：连接数耗尽时排队等待，而不是无限新建
+    pool = redis.BlockingConnectionPool.from_url(
         redis_url,
+        max_connections=max_connections,
+        timeout=POOL_WAIT_TIMEOUT,
         decode_responses=True,
         socket_connect_timeout=5,
-        socket_timeout=5
+        socket_timeout=socket_timeout,
+        retry_on_timeout=True,
+        health_check_interval=30,
+        **tcp_options
     )
+    redis_client = redis.Redis(connection_pool=pool)
     
     # 测试连接
     try:
         redis_client.ping()
-        print(f"[Worker Redis] ✅ Connected successfully")
+        # redis-py 在安装了 hiredis 时自动使用 C 解析器，这里打印出来便于发现部署回退
+        parser_name = "hiredis" if HIREDIS_AVAILABLE else "python"
+        print(f"[Worker Redis] ✅ Connected successfully (parser: {parser_name}, tcp_nodelay: {_get_tcp_nodelay(pool)})")
     except Exception as e:
         print(f"[Worker Redis] ❌ Connection failed: {e}")
         raise
     
     return redis_client
 
+
+def _sanitize_redis_url(redis_url: str) -> str:
+    """
+    生成用于日志显示的 Redis URL（隐藏密码并截断）
+    
+    Args:
+        redis_url: Redis 连接 URL
+        
+    Returns:
+        str: 可安全打印的 URL
+    """
+    if "@" in redis_url:
+        # 隐藏密码部分
+        scheme = redis_url.split("://", 1)[0]
+        host_part = redis_url.rsplit("@", 1)[1]
+        return f"{scheme}://****@{host_part[:30]}..."
+    return redis_url[:30] + "..." if len(redis_url) > 30 else redis_url
+
+
+def _get_tcp_nodelay(pool: redis.ConnectionPool) -> str:
+    """
+    读取一个池内连接的 TCP_NODELAY 设置（redis-py 默认开启，用于启动日志确认）
+    
+    Args:
+        pool: 连接池
+        
+    Returns:
+        str: "on" / "off"，无法读取（如 unix socket）时返回 "n/a"
+    """
+    conn = pool.get_connection("PING")
+    try:
+        sock = getattr(conn, "_sock", None)
+        if sock is None or sock.family == getattr(socket, "AF_UNIX", None):
+            return "n/a"
+        return "on" if sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY) else "off"
+    except OSError:
+        return "n/a"
+    finally:
+        pool.release(conn)
+
+
+def _get_pool_size() -> int:
+    """
+    计算阻塞命令专用连接池的大小
+    
+    每个 Worker 消费线程在 BLPOP 期间独占一个连接，连接池按消费线程数分配，
+    多留一个给 Worker 停止时仍在收尾的预取线程。
+    
+    Returns:
+        int: 连接池最大连接数
+    """
+    return get_worker_concurrency() + 1
+
+
+def get_worker_concurrency() -> int:
+    """
+    计算 Worker 进程的消费线程数
+    
+    每个消费线程处理任务时都会使用共享连接池写入进度，
+    线程数不超过共享连接池扣除保留连接后的数量，避免线程排队等待连接。
+    
+    Returns:
+        int: 消费线程数（至少为 1）
+    """
+    limit = settings.REDIS_POOL_SIZE - POOL_RESERVED_CONNECTIONS
+    return max(1, min(settings.WORKER_CONCURRENCY, limit))
@@ -2,19 +2,74 @@
 Pipeline Worker - 调用真实的 Pipeline 处理任务
 用于生产环境，执行实际的 AI 处理
 """
+import atexit
+import logging
+import logging.handlers
+import multiprocessing
+import queue
+import random
 import time
 import signal
 import sys
-from typing import Optional
+import threading
+import traceback
+from typing import Callable, Dict, Optional
 from pathlib import Path
 
+import redis
+
+from app.core.config import settings
 from app.services.tasks.queue import get_task_queue
 from app.services.tasks.manager import get_task_service
 from app.schemas.task import EditMode
+from app.services.image.pipelines.base import PipelineBase
 from app.services.image.pipelines.pose_change_pipeline import PoseChangePipeline
 from app.services.image.dto import EditTaskInput
 from app.core.error_codes import TaskErrorCode, create_error
 
+# Worker 日志：业务线程只把记录放入内存队列，由后台线程统一格式化并写出
+logger = logging.getLogger("worker")
+
+
+def _setup_logging() -> logging.handlers.QueueListener:
+    """配置 Worker 日志（QueueHandler + 后台 QueueListener）"""
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    # 进程退出时排空队列，保证最后的日志都能写出
+    atexit.register(listener.stop)
+    
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return listener
+
+
+_log_listener = _setup_logging()
+
+# 进度更新的合并提交间隔（秒）
+PROGRESS_FLUSH_INTERVAL = 0.1
+
+# 预取队列状态日志间隔（秒）
+QUEUE_STATS_LOG_INTERVAL = 60
+
+# 预取队列满时的检查间隔（秒）
+PREFETCH_WAIT_INTERVAL = 0.05
+
+# 停止时等待预取线程退出的最长时间（秒），需远小于容器停止宽限期
+PREFETCH_JOIN_TIMEOUT = 2
+
+# 出错重试的指数退避上限：最长等待 2**6 = 64 秒以内的随机时长
+MAX_BACKOFF_EXPONENT = 6
+
+# 编辑模式 -> Pipeline 构造函数（已接入真实 Pipeline 的模式）
+_PIPELINE_FACTORIES: Dict[str, Callable[[], PipelineBase]] = {
+    EditMode.POSE_CHANGE.value: PoseChangePipeline,
+}
+
 
 class PipelineWorker:
     """Pipeline Worker 类 - 调用真实 Pipeline"""
@@ -26,10 +81,51 @@ class PipelineWorker:
         self.is_running = False
         self._setup_signal_handlers()
         
-        # 初始化 Pipelines
-        self.pose_pipeline = PoseChangePipeline()
+        # 预取队列：后台线程在当前任务执行期间提前 BLPOP 下一个任务。
+        # 队列有界：满了之后预取线程先等待空位，不再从 Redis 取任务，多余任务留给其他 Worker
+        self._prefetch_q: "queue.Queue[str]" = queue.Queue(maxsize=max(1, settings.WORKER_PREFETCH_SIZE))
+        self._prefetch_thread: Optional[threading.Thread] = None
+        
+        # Pipelines 在首次使用时创建并复用；PREWARM_MODES 中的模式在启动时预先创建
+        self._pipelines: Dict[str, PipelineBase] = {}
+        self._prewarm_pipelines()
+        
+        # 编辑模式 -> 处理函数
+        self._dispatch: Dict[str, Callable[[str, str, dict], Optional[dict]]] = {
+            EditMode.POSE_CHANGE.value: self._process_pose_change,
+            EditMode.HEAD_SWAP.value: self._process_head_swap,
+            EditMode.BACKGROUND_CHANGE.value: self._process_background_change,
+        }
+        
+        logger.info("[Worker] Pipeline Worker 初始化完成")
+    
+    def _prewarm_pipelines(self):
+        """预先创建 PREWARM_MODES 中配置的 Pipeline"""
+        for mode in settings.PREWARM_MODES.split(","):
+            mode = mode.strip().upper()
+            if not mode:
+                continue
+            if mode not in _PIPELINE_FACTORIES:
+                logger.warning(f"[Worker] ⚠️  PREWARM_MODES 中的模式没有对应 Pipeline，已忽略: {mode}")
+                continue
+            self._get_pipeline(mode)
+            logger.info(f"[Worker] 🔥 已预热 Pipeline: {mode}")
+    
+    def _get_pipeline(self, mode: str) -> PipelineBase:
+        """
+        获取编辑模式对应的 Pipeline（首次调用时创建）
         
-        print("[Worker] Pipeline Worker 初始化完成")
+        Args:
+            mode: 编辑模式
+            
+        Returns:
+            PipelineBase: Pipeline 实例
+        """
+        pipeline = self._pipelines.get(mode)
+        if pipeline is None:
+            pipeline = _PIPELINE_FACTORIES[mode]()
+            self._pipelines[mode] = pipeline
+        return pipeline
     
     def _setup_signal_handlers(self):
         """设置信号处理器（优雅关闭）"""
@@ -38,61 +134,127 @@ class PipelineWorker:
     
     def _handle_shutdown(self, signum, frame):
         """处理关闭信号"""
-        print("\n[Worker] 接收到关闭信号，正在停止...")
+        logger.info("\n[Worker] 接收到关闭信号，正在停止...")
         self.is_running = False
     
     def start(self):
         """启动 Worker 循环"""
-        print("[Worker] Pipeline Worker 已启动，等待任务...")
-        print("[Worker] 将调用真实的 ComfyUI Pipeline 处理任务")
-        print("[Worker] 按 Ctrl+C 停止\n")
+        logger.info("[Worker] Pipeline Worker 已启动，等待任务...")
+        logger.info("[Worker] 将调用真实的 ComfyUI Pipeline 处理任务")
+        logger.info("[Worker] 按 Ctrl+C 停止\n")
         
         self.is_running = True
+        self._prefetch_thread = threading.Thread(
+            target=self._prefetch_loop, name="task-prefetch", daemon=True
+        )
+        self._prefetch_thread.start()
         
+        failures = 0
+        last_stats_log = time.monotonic()
         while self.is_running:
+            now = time.monotonic()
+            if now - last_stats_log >= QUEUE_STATS_LOG_INTERVAL:
+                logger.info(f"[Worker] 📈 预取队列: {self._prefetch_q.qsize()}/{self._prefetch_q.maxsize}")
+                last_stats_log = now
+            
             try:
-                # 从队列中获取任务（阻塞式，超时 5 秒）
-                task_id = self.queue.pop_task(timeout=5)
+                # 取预取线程拿到的任务（超时只是为了定期检查 is_running）
+                task_id = self._prefetch_q.get(timeout=1)
+            except queue.Empty:
+                continue
+            
+            try:
+                logger.info(f"\n{'='*60}")
+                logger.info(f"[Worker] 📥 获取到任务: {task_id}")
+                logger.info(f"{'='*60}")
                 
-                if task_id:
-                    print(f"\n{'='*60}")
-                    print(f"[Worker] 📥 获取到任务: {task_id}")
-                    print(f"{'='*60}")
-                    
-                    # 立即标记任务为处理中
-                    try:
-                        self.queue.update_task_status(
-                            task_id=task_id,
-                            status="processing",
-                            progress=0,
-                            current_step="Worker 已接收任务，正在初始化..."
-                        )
-                        print(f"[Worker] ✅ 任务状态已更新为 processing")
-                    except Exception as e:
-                        print(f"[Worker] ⚠️  更新任务状态失败: {e}")
-                    
-                    # 处理任务
-                    self._process_task(task_id)
-                else:
-                    # 超时未获取到任务，继续循环
-                    continue
-                    
-            except Exception as e:
-                # 检查是否是 Redis 超时错误（队列空闲）
-                error_msg = str(e).lower()
-                if 'timeout' in error_msg or 'reading from socket' in error_msg:
-                    # 这只是队列暂时没有任务，不是真正的错误
-                    # 静默处理，继续等待
-                    time.sleep(1)
-                    continue
+                # 处理任务（开始时标记为 processing）
+                self._process_task(task_id)
+                failures = 0
                 
+            except Exception as e:
                 # 其他异常才是真正的错误
-                print(f"[Worker] ❌ Worker 循环出错: {e}")
-                import traceback
-                traceback.print_exc()
-                time.sleep(1)
+                logger.exception(f"[Worker] ❌ Worker 循环出错: {e}")
+                failures = min(failures + 1, MAX_BACKOFF_EXPONENT)
+                time.sleep(self._backoff_delay(failures))
         
-        print("[Worker] Pipeline Worker 已停止")
+        self._return_prefetched_tasks()
+        logger.info("[Worker] Pipeline Worker 已停止")
+    
+    def _prefetch_loop(self):
+        """预取线程：预取队列有空位时才从 Redis 获取下一个任务并交给主线程"""
+        failures = 0
+        while self.is_running:
+            # 先等预取队列空出槽位再 BLPOP，队列满时不从 Redis 多取任务
+            if self._prefetch_q.full():
+                time.sleep(PREFETCH_WAIT_INTERVAL)
+                continue
+            
+            try:
+                # 从队列中获取任务（阻塞式，有任务入队时立即返回）
+                task_id = self.queue.pop_task()
+                failures = 0
+            except (redis.ConnectionError, redis.TimeoutError) as e:
+                # Redis 连接异常：指数退避（带随机抖动）后重连，避免多个 Worker 同时重连
+                failures = min(failures + 1, MAX_BACKOFF_EXPONENT)
+                delay = self._backoff_delay(failures)
+                logger.warning(f"[Worker] ⚠️  Redis 连接异常，{delay:.1f} 秒后重试: {e}")
+                time.sleep(delay)
+                continue
+            
+            if not task_id:
+                continue
+            
+            # BLPOP 期间 Worker 已停止：直接归还任务
+            if not self.is_running:
+                self._requeue(task_id)
+                return
+            
+            try:
+                # 只有本线程向预取队列放入任务，上面已确认有空位
+                self._prefetch_q.put_nowait(task_id)
+            except queue.Full:
+                self._requeue(task_id)
+    
+    def _requeue(self, task_id: str):
+        """把已取出但未处理的任务归还 Redis 队列"""
+        self.queue.requeue_task(task_id)
+        logger.info(f"[Worker] ↩️  Worker 停止，已归还任务: {task_id}")
+    
+    @staticmethod
+    def _backoff_delay(failures: int) -> float:
+        """
+        计算第 failures 次连续失败后的等待时间（full jitter 指数退避）
+        
+        Args:
+            failures: 连续失败次数
+            
+        Returns:
+            float: 等待秒数，范围 [0, 2**failures)
+        """
+        return random.uniform(0, 2 ** failures)
+    
+    def _return_prefetched_tasks(self):
+        """
+        Worker 停止时，把已预取但未处理的任务归还 Redis 队列
+        
+        先立即归还预取队列中的任务（不等待预取线程，避免容器停止超时被 SIGKILL 时丢任务），
+        再短暂等待预取线程退出并归还它在此期间放入的任务。
+        仍阻塞在 BLPOP 中的预取线程若之后取到任务，会自行归还。
+        """
+        self._drain_prefetch_queue()
+        if self._prefetch_thread is not None:
+            self._prefetch_thread.join(timeout=PREFETCH_JOIN_TIMEOUT)
+        self._drain_prefetch_queue()
+    
+    def _drain_prefetch_queue(self):
+        """归还预取队列中所有任务"""
+        while True:
+            try:
+                task_id = self._prefetch_q.get_nowait()
+            except queue.Empty:
+                break
+            self._requeue(task_id)
     
     def _process_task(self, task_id: str):
         """
@@ -102,13 +264,13 @@ class PipelineWorker:
             task_id: 任务ID
         """
         try:
-            # 1. 获取任务数据
-            print(f"[Worker] 📋 正在获取任务数据...")
-            task_data = self.queue.get_task_data(task_id)
+            # 1. 立即标记任务为处理中，同时获取任务数据（同一次 Redis 往返）
+            logger.info(f"[Worker] 📋 正在获取任务数据...")
+            task_data = self.task_service.begin_task(task_id, "Worker 已接收任务，正在初始化...")
             
             if not task_data:
                 error_msg = f"任务数据不存在: {task_id}"
-                print(f"[Worker] ❌ {error_msg}")
+                logger.error(f"[Worker] ❌ {error_msg}")
                 self.task_service.fail_task(
                     task_id=task_id,
                     error_code="TASK_DATA_NOT_FOUND",
@@ -123,9 +285,9 @@ class PipelineWorker:
             source_image = input_data.get("source_image")
             config = input_data.get("config", {})
             
-            print(f"[Worker] 📌 任务模式: {mode}")
-            print(f"[Worker] 🖼️  原始图片: {source_image}")
-            print(f"[Worker] ⚙️  配置: {config}")
+            logger.info(f"[Worker] 📌 任务模式: {mode}")
+            logger.info(f"[Worker] 🖼️  原始图片: {source_image}")
+            logger.info(f"[Worker] ⚙️  配置: {config}")
             
             # 3. 验证必要参数
             if not mode:
@@ -135,7 +297,7 @@ class PipelineWorker:
                     error_message="任务模式 (mode) 缺失",
                     error_details="请求中未指定编辑模式"
                 )
-                print(f"[Worker] ❌ 任务模式缺失")
+                logger.error(f"[Worker] ❌ 任务模式缺失")
                 return
             
             if not source_image:
@@ -145,7 +307,7 @@ class PipelineWorker:
                     error_message="原始图片 (source_image) 缺失",
                     error_details="请求中未指定原始图片路径"
                 )
-                print(f"[Worker] ❌ 原始图片缺失")
+                logger.error(f"[Worker] ❌ 原始图片缺失")
                 return
             
             # 4. 更新状态为处理中（第二次更新，带更详细的信息）
@@ -156,7 +318,7 @@ class PipelineWorker:
             )
             
             # 5. 根据模式分发到对应的 Pipeline
-            print(f"[Worker] 🚀 开始处理任务...")
+            logger.info(f"[Worker] 🚀 开始处理任务...")
             result = self._dispatch_to_pipeline(
                 task_id=task_id,
                 mode=mode,
@@ -167,10 +329,10 @@ class PipelineWorker:
             # 6. 标记任务完成或失败
             if result:
                 self.task_service.complete_task(task_id, result)
-                print(f"[Worker] ✅ 任务完成: {task_id}")
-                print(f"[Worker] 📸 输出图片: {result.get('output_image')}")
+                logger.info(f"[Worker] ✅ 任务完成: {task_id}")
+                logger.info(f"[Worker] 📸 输出图片: {result.get('output_image')}")
                 if result.get('comparison_image'):
-                    print(f"[Worker] 🔀 对比图片: {result.get('comparison_image')}")
+                    logger.info(f"[Worker] 🔀 对比图片: {result.get('comparison_image')}")
             else:
                 self.task_service.fail_task(
                     task_id=task_id,
@@ -178,15 +340,14 @@ class PipelineWorker:
                     error_message="Pipeline 处理失败",
                     error_details=f"模式 {mode} 的处理流程返回了空结果"
                 )
-                print(f"[Worker] ❌ 任务失败: {task_id} - Pipeline 返回空结果")
+                logger.error(f"[Worker] ❌ 任务失败: {task_id} - Pipeline 返回空结果")
                 
         except Exception as e:
-            print(f"[Worker] ❌ 处理任务异常: {task_id}")
-            print(f"[Worker] 💥 错误类型: {type(e).__name__}")
-            print(f"[Worker] 📝 错误信息: {e}")
-            import traceback
+            logger.error(f"[Worker] ❌ 处理任务异常: {task_id}")
+            logger.error(f"[Worker] 💥 错误类型: {type(e).__name__}")
+            logger.error(f"[Worker] 📝 错误信息: {e}")
             error_traceback = traceback.format_exc()
-            print(error_traceback)
+            logger.error(error_traceback)
             
             # 标记任务失败，包含详细的错误信息
             try:
@@ -197,7 +358,7 @@ class PipelineWorker:
                     error_details=f"{str(e)}\n\n堆栈跟踪:\n{error_traceback}"
                 )
             except Exception as fail_error:
-                print(f"[Worker] ⚠️  无法标记任务失败: {fail_error}")
+                logger.warning(f"[Worker] ⚠️  无法标记任务失败: {fail_error}")
     
     def _dispatch_to_pipeline(
         self,
@@ -219,27 +380,33 @@ class PipelineWorker:
             Optional[dict]: 处理结果（包含 output_image, thumbnail, metadata）
         """
         try:
-            print(f"[Worker] 分发任务到 Pipeline - 模式: {mode}")
+            logger.info(f"[Worker] 分发任务到 Pipeline - 模式: {mode}")
             
-            # 根据模式调用对应的 Pipeline
-            if mode == EditMode.POSE_CHANGE.value:
-                return self._process_pose_change(task_id, source_image, config)
-            elif mode == EditMode.HEAD_SWAP.value:
-                print(f"[Worker] ⚠️  换头功能尚未实现，使用模拟处理")
-                return self._process_mock(task_id, source_image, config)
-            elif mode == EditMode.BACKGROUND_CHANGE.value:
-                print(f"[Worker] ⚠️  换背景功能尚未实现，使用模拟处理")
-                return self._process_mock(task_id, source_image, config)
-            else:
-                print(f"[Worker] ❌ 不支持的编辑模式: {mode}")
-                return None
+            # 根据模式调用对应的处理函数
+            handler = self._dispatch.get(mode)
+            if handler is None:
+                return self._unsupported(mode)
+            return handler(task_id, source_image, config)
                 
         except Exception as e:
-            print(f"[Worker] ❌ Pipeline 处理失败: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"[Worker] ❌ Pipeline 处理失败: {e}")
             return None
     
+    def _unsupported(self, mode: str) -> None:
+        """不支持的编辑模式"""
+        logger.error(f"[Worker] ❌ 不支持的编辑模式: {mode}")
+        return None
+    
+    def _process_head_swap(self, task_id: str, source_image: str, config: dict) -> Optional[dict]:
+        """处理换头任务（尚未接入真实 Pipeline，使用模拟处理）"""
+        logger.warning(f"[Worker] ⚠️  换头功能尚未实现，使用模拟处理")
+        return self._process_mock(task_id, source_image, config)
+    
+    def _process_background_change(self, task_id: str, source_image: str, config: dict) -> Optional[dict]:
+        """处理换背景任务（尚未接入真实 Pipeline，使用模拟处理）"""
+        logger.warning(f"[Worker] ⚠️  换背景功能尚未实现，使用模拟处理")
+        return self._process_mock(task_id, source_image, config)
+    
     def _process_pose_change(
         self, 
         task_id: str, 
@@ -257,45 +424,50 @@ class PipelineWorker:
         Returns:
             Optional[dict]: 处理结果
         """
-        print(f"[Worker] 🎨 开始执行换姿势 Pipeline...")
+        logger.info(f"[Worker] 🎨 开始执行换姿势 Pipeline...")
         
         try:
-            # 构建 Pipeline 输入
-            from app.schemas.image import PoseChangeConfig
-            
-            # 进度回调函数
-            def progress_callback(progress: int, message: str):
-                try:
-                    self.task_service.update_task_progress(task_id, progress, message)
-                    print(f"[Worker] 📊 进度: {progress}% - {message}")
-                except Exception as e:
-                    print(f"[Worker] ⚠️  更新进度失败: {e}")
-            
-            # 更新进度
-            progress_callback(10, "正在准备 Pipeline 输入...")
-            
-            # 构建输入对象
-            task_input = EditTaskInput(
-                task_id=task_id,
-                source_image=source_image,
-                mode=EditMode.POSE_CHANGE,
-                config=config,
-                progress_callback=progress_callback
-            )
-            
-            print(f"[Worker] 📦 Pipeline 输入已准备完成")
-            progress_callback(15, "正在调用 ComfyUI Pipeline...")
-            
-            # 执行 Pipeline
-            result = self.pose_pipeline.execute(task_input)
+            # 进度更新先缓冲，每 100ms 或进度到 100% 时通过 pipeline 一次提交；
+            # 离开 with 时提交剩余更新，保证写入顺序早于 complete_task / fail_task
+            with self.task_service.progress_batch(
+                task_id, flush_interval=PROGRESS_FLUSH_INTERVAL
+            ) as progress_batch:
+                
+                # 进度回调函数
+                def progress_callback(progress: int, message: str):
+                    try:
+                        progress_batch.update(progress, message)
+                        if progress >= 100:
+                            progress_batch.flush()
+                        logger.info(f"[Worker] 📊 进度: {progress}% - {message}")
+                    except Exception as e:
+                        logger.warning(f"[Worker] ⚠️  更新进度失败: {e}")
+                
+                # 更新进度
+                progress_callback(10, "正在准备 Pipeline 输入...")
+                
+                # 构建输入对象
+                task_input = EditTaskInput(
+                    task_id=task_id,
+                    source_image=source_image,
+                    mode=EditMode.POSE_CHANGE,
+                    config=config,
+                    progress_callback=progress_callback
+                )
+                
+                logger.info(f"[Worker] 📦 Pipeline 输入已准备完成")
+                progress_callback(15, "正在调用 ComfyUI Pipeline...")
+                
+                # 执行 Pipeline
+                result = self._get_pipeline(EditMode.POSE_CHANGE.value).execute(task_input)
             
             # 检查结果
             if result.success:
-                print(f"[Worker] ✅ Pipeline 执行成功")
-                print(f"[Worker] 📸 输出图片: {result.output_image}")
-                print(f"[Worker] 🖼️  缩略图: {result.thumbnail}")
+                logger.info(f"[Worker] ✅ Pipeline 执行成功")
+                logger.info(f"[Worker] 📸 输出图片: {result.output_image}")
+                logger.info(f"[Worker] 🖼️  缩略图: {result.thumbnail}")
                 if result.comparison_image:
-                    print(f"[Worker] 🔀 对比图: {result.comparison_image}")
+                    logger.info(f"[Worker] 🔀 对比图: {result.comparison_image}")
                 
                 return {
                     "output_image": result.output_image,
@@ -304,9 +476,9 @@ class PipelineWorker:
                     "metadata": result.metadata
                 }
             else:
-                print(f"[Worker] ❌ Pipeline 执行失败")
-                print(f"[Worker] 🔴 错误码: {result.error_code}")
-                print(f"[Worker] 📝 错误信息: {result.error_message}")
+                logger.error(f"[Worker] ❌ Pipeline 执行失败")
+                logger.error(f"[Worker] 🔴 错误码: {result.error_code}")
+                logger.error(f"[Worker] 📝 错误信息: {result.error_message}")
                 
                 # 将 Pipeline 错误传递到任务状态
                 self.task_service.fail_task(
@@ -321,12 +493,11 @@ class PipelineWorker:
                 return None
                 
         except Exception as e:
-            print(f"[Worker] ❌ Pipeline 执行异常")
-            print(f"[Worker] 💥 异常类型: {type(e).__name__}")
-            print(f"[Worker] 📝 异常信息: {e}")
-            import traceback
+            logger.error(f"[Worker] ❌ Pipeline 执行异常")
+            logger.error(f"[Worker] 💥 异常类型: {type(e).__name__}")
+            logger.error(f"[Worker] 📝 异常信息: {e}")
             error_trace = traceback.format_exc()
-            print(error_trace)
+            logger.error(error_trace)
             
             # 记录详细错误
             self.task_service.fail_task(
@@ -356,7 +527,7 @@ class PipelineWorker:
         """
         from app.services.image.image_assets import resolve_uploaded_file, copy_image_to_results
         
-        print(f"[Worker] 使用模拟处理...")
+        logger.info(f"[Worker] 使用模拟处理...")
         
         try:
             source_path = resolve_uploaded_file(source_image)
@@ -375,32 +546,91 @@ class PipelineWorker:
                 }
             }
         except Exception as e:
-            print(f"[Worker] 模拟处理失败: {e}")
+            logger.error(f"[Worker] 模拟处理失败: {e}")
             return None
 
 
 def run_pipeline_worker():
     """运行 Pipeline Worker（入口函数）"""
-    print("="*60)
-    print("Formy Pipeline Worker")
-    print("="*60)
-    print("此 Worker 会调用真实的 Pipeline 处理任务")
-    print("包括 ComfyUI 工作流调用")
-    print("="*60)
+    logger.info("="*60)
+    logger.info("Formy Pipeline Worker")
+    logger.info("="*60)
+    logger.info("此 Worker 会调用真实的 Pipeline 处理任务")
+    logger.info("包括 ComfyUI 工作流调用")
+    logger.info("="*60)
     
     # 检查 Redis 连接
     queue = get_task_queue()
-    if not queue.health_check():
-        print("[错误] 无法连接到 Redis，请检查配置")
+    if not queue.health_check(startup=True):
+        logger.error("[错误] 无法连接到 Redis，请检查配置")
         sys.exit(1)
     
-    print("[成功] Redis 连接正常")
+    logger.info("[成功] Redis 连接正常")
+    
+    # Worker 是纯同步流程，必须使用同步 redis-py 客户端（见 get_redis_client 的说明）
+    client_class = type(queue.redis_client)
+    if not isinstance(queue.redis_client, redis.Redis):
+        logger.error(f"[错误] Worker 需要同步 Redis 客户端，实际为: {client_class.__module__}.{client_class.__name__}")
+        sys.exit(1)
+    logger.info(f"[Worker] Redis 客户端: {client_class.__module__}.{client_class.__name__}")
+    
+    # 队列与任务服务应共享同一个客户端（同一个连接池）
+    if get_task_service().queue.redis_client is not queue.redis_client:
+        logger.warning("[Worker] ⚠️  任务服务与队列使用了不同的 Redis 客户端，连接池未共享")
     
     # 启动 Worker
+    if settings.WORKER_PROCESSES > 1:
+        _run_worker_processes(settings.WORKER_PROCESSES)
+        return
+    
     worker = PipelineWorker()
     worker.start()
 
 
+def _worker_process_main():
+    """子进程入口：每个进程有独立的 Redis 连接池和 Pipeline 实例"""
+    worker = PipelineWorker()
+    worker.start()
+
+
+def _run_worker_processes(count: int):
+    """
+    以 spawn 方式启动多个 Worker 子进程并等待其退出
+    
+    子进程是全新的解释器，不会继承父进程的 Redis 连接；
+    父进程收到 SIGINT / SIGTERM 时转发 SIGTERM 给所有子进程，由子进程各自优雅退出。
+    
+    Args:
+        count: 子进程数量
+    """
+    ctx = multiprocessing.get_context("spawn")
+    processes = [
+        ctx.Process(target=_worker_process_main, name=f"pipeline-worker-{i}")
+        for i in range(count)
+    ]
+    
+    def forward_shutdown(signum, frame):
+        logger.info(f"\n[Worker] 接收到关闭信号，通知 {count} 个子进程停止...")
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+    
+    for process in processes:
+        process.start()
+    logger.info(f"[Worker] 已启动 {count} 个 Worker 子进程")
+    
+    # 子进程启动后再安装转发处理器（子进程在自身初始化时设置自己的处理器）
+    signal.signal(signal.SIGINT, forward_shutdown)
+    signal.signal(signal.SIGTERM, forward_shutdown)
+    
+    for process in processes:
+        process.join()
+        if process.exitcode:
+            logger.warning(f"[Worker] ⚠️  子进程 {process.name} 异常退出，exitcode={process.exitcode}")
+    
+    logger.info("[Worker] 所有 Worker 子进程已停止")
+
+
 if __name__ == "__main__":
     run_pipeline_worker()
 